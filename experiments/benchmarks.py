@@ -0,0 +1,150 @@
+"""
+Micro-benchmarks for the model's hot paths.
+
+Run from the repository root, e.g.
+
+    python -m experiments.benchmarks lexicon_footprint
+
+Results from a reference machine are kept in experiments/BENCHMARKS.md.
+"""
+import sys
+import time
+import tracemalloc
+
+import model.memory as mem
+from model.complexity import Space, LocalSpace, PeakSpace, RunScope, _CURRENT_RUN
+
+# ---------------------------------------------------------------------#
+
+def _traced(build):
+    """Peak traced bytes and wall time of `build()`, keeping its result alive."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current, elapsed
+
+def lexicon_footprint(sizes=(10_000, 100_000), divs=10):
+    """Retained bytes per token for the graph and the columnar backends."""
+    rows = []
+    for n in sizes:
+        names = [f"t{i}" for i in range(n)]
+        colours = [f"c{i % divs}" for i in range(n)]
+        shapes = [f"s{i % 7}" for i in range(n)]
+
+        def graph():
+            return mem.Lexicon(tokens=[
+                mem.Token(name=a, attribute1=b, attribute2=c) for a, b, c in zip(names, colours, shapes)
+            ])
+
+        def compact():
+            return mem.CompactLexicon.from_columns(names, attribute1=colours, attribute2=shapes)
+
+        for label, build in (("Lexicon", graph), ("CompactLexicon", compact)):
+            size, elapsed = _traced(build)
+            rows.append((label, n, size / n, elapsed))
+    print(f"{'backend':<16}{'n':>10}{'bytes/token':>14}{'build s':>10}")
+    for label, n, per_token, elapsed in rows:
+        print(f"{label:<16}{n:>10}{per_token:>14.1f}{elapsed:>10.3f}")
+    return rows
+
+def space_modes(ops=1_000_000, live=64):
+    """ns per register/update/purge call for each Space implementation."""
+    objs = [mem.Queue(track=False) for _ in range(live)]
+    rows = []
+    for cls in (Space, LocalSpace, PeakSpace):
+        space = cls()
+        t0 = time.perf_counter()
+        for i in range(ops // 4):
+            obj = objs[i % live]
+            space.register(obj, 1.0)
+            space.update(obj, 2.0)
+            space.update(obj, 3.0)
+            space.purge(obj)
+        elapsed = time.perf_counter() - t0
+        rows.append((cls.__name__, elapsed / ops * 1e9))
+    print(f"{'space':<12}{'ns/call':>10}")
+    for label, ns in rows:
+        print(f"{label:<12}{ns:>10.1f}")
+    return rows
+
+def arena_modes(scopes=20_000, per_scope=50, runs=20_000):
+    """Structure creation cost per scope mode, and memory drift over many runs."""
+    import gc
+    import model.cognitive_functions as cf
+    print(f"{'scope':<12}{'ns/object':>10}")
+    for label, arena in (("finalizer", False), ("arena", True)):
+        t0 = time.perf_counter()
+        for _ in range(scopes):
+            scope = RunScope(arena=arena)
+            token = _CURRENT_RUN.set(scope)
+            for _ in range(per_scope):
+                mem.Queue()
+            _CURRENT_RUN.reset(token)
+            scope.release()
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<12}{elapsed / (scopes * per_scope) * 1e9:>10.1f}")
+    template = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 2}") for i in range(6)])
+    tracemalloc.start()
+    marks = []
+    for i in range(runs):
+        cf.iterate(template.copy(), seed=i)
+        if i % (runs // 4) == runs // 4 - 1:
+            gc.collect()
+            marks.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    print("traced bytes after each quarter of", runs, "runs:", marks)
+    return marks
+
+def lexicon_factory(sizes=(12, 120, 1200), divs=4, budget=1.0):
+    """Lexicons per second: Tokens by hand vs a compiled LexiconSpec template."""
+    from model.lexicons import LexiconSpec
+
+    def rate(build):
+        done, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < budget:
+            build()
+            done += 1
+        return done / (time.perf_counter() - t0)
+
+    rows = []
+    for n in sizes:
+        for dims in (1, 2):
+            spec = LexiconSpec(n, divs, dims)
+            names, attribute1, attribute2 = spec.columns()
+            attribute2 = attribute2 or [None] * n
+
+            def by_hand():
+                return mem.Lexicon(tokens=[
+                    mem.Token(name=a, attribute1=b, attribute2=c)
+                    for a, b, c in zip(names, attribute1, attribute2)
+                ])
+
+            template = spec.template()
+            compact = LexiconSpec(n, divs, dims, "compact").template()
+            for label, build in (("by hand", by_hand), ("template", template.stamp),
+                                 ("compact template", compact.stamp)):
+                rows.append((label, n, dims, rate(build)))
+    print(f"{'build':<18}{'n':>6}{'dims':>6}{'lexicons/s':>12}")
+    for label, n, dims, per_s in rows:
+        print(f"{label:<18}{n:>6}{dims:>6}{per_s:>12.0f}")
+    return rows
+
+# ---------------------------------------------------------------------#
+
+BENCHMARKS = {
+    "lexicon_footprint": lexicon_footprint,
+    "space_modes": space_modes,
+    "arena_modes": arena_modes,
+    "lexicon_factory": lexicon_factory,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+import hashlib
+import importlib
+import os
+import pickle
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import model.memory as mem
+from model.complexity import PRIMITIVES, RunSnapshot
+
+# Changing any of these modules invalidates every cached result.
+# modules whose code decides a run's mdl and space: the functions and
+# primitives, and the structures and bookkeeping that weigh them
+SOURCES = ("model.cognitive_functions", "model.primitive_fucntions", "model.memory", "model.complexity")
+
+TokenKey = Tuple  # (name, attribute1, attribute2, ordinate, linked)
+
+# LRU clock: a counter rather than wall time, so no two uses tie
+_NEXT_USE = "(SELECT COALESCE(MAX(used), 0) + 1 FROM runs)"
+
+@dataclass
+class CachedRun:
+    snapshot: RunSnapshot
+    sequence: Tuple[TokenKey, ...]
+
+    def tokens(self):
+        """The sequence rebuilt as untracked Tokens."""
+        return [mem.Token(n, a1, a2, ordinate=o, track=False) for n, a1, a2, o, _ in self.sequence]
+
+def _code_digest(code, h):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(const, h)
+        else:
+            h.update(repr(const).encode())
+
+def _primitive_table(h):
+    pf = importlib.import_module("model.primitive_fucntions")
+    for name in PRIMITIVES:
+        fn = getattr(getattr(pf, name, None), "__wrapped__", None)
+        if fn is not None:
+            h.update(name.encode())
+            _code_digest(fn.__code__, h)
+
+def _sources_digest() -> str:
+    h = hashlib.sha256()
+    for name in SOURCES:
+        with open(importlib.import_module(name).__file__, "rb") as f:
+            h.update(f.read())
+    _primitive_table(h)
+    return h.hexdigest()
+
+def lexicon_signature(lexicon) -> Tuple:
+    """
+    Canonical, order-preserving description of a lexicon: token order
+    matters to sampling, so tokens are not sorted. The backend type is part
+    of it, since graph and compact lexicons sample differently.
+    """
+    tokens = tuple(
+        (t.name, t.attribute1, t.attribute2, t.ordinate, t.linked,
+         tuple(sorted(s.name for s in t.successors)))
+        for t in lexicon.tokens
+    )
+    return (type(lexicon).__name__, getattr(lexicon, "dimension", None), getattr(lexicon, "linked", False),
+            getattr(lexicon, "ordered", False), tokens)
+
+def _sequence_keys(result) -> Tuple[TokenKey, ...]:
+    if getattr(result, "ids", None) is not None:
+        return tuple(mem.token_key(tid) for tid in result.ids)
+    items = getattr(result, "items", result)
+    return tuple((t.name, t.attribute1, t.attribute2, t.ordinate, t.linked) for t in items)
+
+class ResultCache:
+    """
+    Content-addressed store of finished runs in a SQLite file.
+    A key covers the function's bytecode, the lexicon signature, the seed,
+    the primitive table and the sources in SOURCES. Entries are evicted
+    least-recently-used once max_entries or max_bytes is exceeded. Each
+    process opens its own connection, and the database runs in WAL mode, so
+    pool workers can share one file.
+    """
+
+    def __init__(self, path, *, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, timeout: float = 30.0):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._conn = None
+        self._pid = None
+        self._sources = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = state["_pid"] = None
+        return state
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, used INTEGER NOT NULL)"
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def key(self, fn: Callable, lexicon, seed: int) -> str:
+        if seed is None:
+            raise ValueError("only seeded runs can be cached")
+        if self._sources is None:
+            self._sources = _sources_digest()
+        fn = getattr(fn, "__wrapped__", fn)
+        h = hashlib.sha256(self._sources.encode())
+        _code_digest(fn.__code__, h)
+        h.update(repr(lexicon_signature(lexicon)).encode())
+        h.update(repr(int(seed)).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedRun]:
+        row = self.conn.execute("SELECT payload FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute(f"UPDATE runs SET used = {_NEXT_USE} WHERE key = ?", (key,))
+        return pickle.loads(row[0])
+
+    def put(self, key: str, snapshot: RunSnapshot, sequence: Tuple[TokenKey, ...]) -> CachedRun:
+        # traces hold live references to the run; only the totals are stored
+        stored = RunSnapshot(
+            mdl=snapshot.mdl,
+            k_complexity_breakdown=dict(snapshot.k_complexity_breakdown),
+            space_complexity=snapshot.space_complexity,
+            peak_breakdown=dict(snapshot.peak_breakdown),
+        )
+        entry = CachedRun(stored, tuple(sequence))
+        payload = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO runs (key, payload, size, used) VALUES (?, ?, ?, {_NEXT_USE})",
+                (key, payload, len(payload)),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return entry
+
+    def _evict(self, conn):
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM runs WHERE key IN (SELECT key FROM runs ORDER BY used DESC "
+                "LIMIT -1 OFFSET ?)", (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM runs").fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                doomed, freed = [], 0
+                for key, size in conn.execute("SELECT key, size FROM runs ORDER BY used"):
+                    if freed >= excess:
+                        break
+                    doomed.append((key,))
+                    freed += size
+                conn.executemany("DELETE FROM runs WHERE key = ?", doomed)
+
+    def clear(self):
+        self.conn.execute("DELETE FROM runs")
+
+    def run(self, fn: Callable, lexicon, seed: int) -> CachedRun:
+        """
+        Return the cached result of `fn(lexicon, seed=seed)`, running it on a
+        copy of `lexicon` and storing the result on a miss.
+        """
+        key = self.key(fn, lexicon, seed)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        result, comp = fn(lexicon.copy(), seed=seed)
+        return self.put(key, comp.last, _sequence_keys(result))
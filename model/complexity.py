@@ -1,14 +1,25 @@
 from contextvars import ContextVar
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from contextlib import contextmanager
 import threading
-from typing import Optional, Dict, Any
+import random
+from typing import Optional, Dict, Any, Callable, List
+import numpy as np
 from functools import wraps
 from collections import deque
 
 _CURRENT_RUN: ContextVar[Optional["RunScope"]] = ContextVar("_CURRENT_RUN", default=None)
 
+# primitive name -> column id, filled in by @primitive_function
+PRIMITIVES: Dict[str, int] = {}
+
+def register_primitive(name: str) -> int:
+    pid = PRIMITIVES.get(name)
+    if pid is None:
+        pid = PRIMITIVES[name] = len(PRIMITIVES)
+    return pid
+
 class Space:
     def __init__(self):
         self.active: Dict[int, float] = {}
@@ -33,30 +44,379 @@ class Space:
             self.max_seen = max(self.max_seen, self.total)
 
     def purge(self, obj: Any):
-        oid = id(obj)
+        self.purge_id(id(obj))
+
+    def purge_id(self, oid: int):
         with self.lock:
             w = self.active.pop(oid, 0.0)
             self.total -= w
 
-class Kolmo:
+    def release(self):
+        """Forget every tracked object at once."""
+        self.active.clear()
+        self.total = 0.0
+
+class LocalSpace(Space):
+    """Space for a scope touched only by its own run: same bookkeeping, no lock."""
     def __init__(self):
+        self.active: Dict[int, float] = {}
+        self.total = 0.0
+        self.max_seen = 0.0
+        self.lock = None
+
+    def register(self, obj: Any, weight: float):
+        oid = id(obj)
+        if oid not in self.active:
+            self.active[oid] = weight
+            self.total += weight
+            if self.total > self.max_seen:
+                self.max_seen = self.total
+
+    def update(self, obj: Any, weight: float):
+        oid = id(obj)
+        old = self.active.get(oid, 0.0)
+        self.active[oid] = weight
+        self.total += weight - old
+        if self.total > self.max_seen:
+            self.max_seen = self.total
+
+    def purge(self, obj: Any):
+        self.total -= self.active.pop(id(obj), 0.0)
+
+    def purge_id(self, oid: int):
+        self.total -= self.active.pop(oid, 0.0)
+
+class PeakSpace(Space):
+    """
+    Single-owner Space that keeps only `total` and `max_seen`. Instead of an
+    `active` dict, each object remembers its own last weight (`_space_w`)
+    and the Space it was registered in (`_space`).
+    """
+    def __init__(self):
+        self.active = None
+        self.total = 0.0
+        self.max_seen = 0.0
+        self.lock = None
+
+    def register(self, obj: Any, weight: float):
+        if getattr(obj, "_space", None) is self:
+            return
+        obj._space = self
+        obj._space_w = weight
+        self.total += weight
+        if self.total > self.max_seen:
+            self.max_seen = self.total
+
+    def update(self, obj: Any, weight: float):
+        old = obj._space_w if getattr(obj, "_space", None) is self else 0.0
+        obj._space = self
+        obj._space_w = weight
+        self.total += weight - old
+        if self.total > self.max_seen:
+            self.max_seen = self.total
+
+    def purge(self, obj: Any):
+        if getattr(obj, "_space", None) is self:
+            self.total -= obj._space_w
+            obj._space = None
+
+    def purge_id(self, oid: int):
+        raise TypeError("PeakSpace keeps no per-object table; use it with an arena scope")
+
+    def release(self):
+        self.total = 0.0
+
+class SpaceTrace:
+    """
+    Opt-in Space timeline. Wraps a run's Space and writes one row per weight
+    change -- (kolmo step, total, delta, structure type) -- into a
+    preallocated NumPy ring buffer, keeping the last `capacity` rows. It also
+    keeps running totals per structure class and a copy of them taken at
+    the peak.
+    """
+    DTYPE = np.dtype([("step", "i8"), ("total", "f8"), ("delta", "f8"), ("type", "i4")])
+
+    def __init__(self, space: Space, kolmo: "Kolmo", capacity: int = 65536):
+        self.space = space
+        self.kolmo = kolmo
+        self.buffer = np.zeros(capacity, dtype=self.DTYPE)
+        self.capacity = capacity
+        self.written = 0
+        self.types: Dict[str, int] = {}
+        self.by_type: Dict[str, float] = defaultdict(float)
+        self.peak_by_type: Dict[str, float] = {}
+        # id -> type name, so finalizer purges (by id only) can be booked
+        self._kinds: Dict[int, str] = {}
+
+    # Space interface -------------------------------------------------
+    @property
+    def total(self) -> float:
+        return self.space.total
+
+    @property
+    def max_seen(self) -> float:
+        return self.space.max_seen
+
+    @property
+    def active(self):
+        return self.space.active
+
+    def register(self, obj: Any, weight: float):
+        before = self.space.total
+        self.space.register(obj, weight)
+        name = self._kinds[id(obj)] = type(obj).__name__
+        self._log(name, before)
+
+    def update(self, obj: Any, weight: float):
+        before = self.space.total
+        self.space.update(obj, weight)
+        self._log(type(obj).__name__, before)
+
+    def purge(self, obj: Any):
+        before = self.space.total
+        self.space.purge(obj)
+        self._kinds.pop(id(obj), None)
+        self._log(type(obj).__name__, before)
+
+    def purge_id(self, oid: int):
+        before = self.space.total
+        self.space.purge_id(oid)
+        name = self._kinds.pop(oid, None)
+        if name is not None:
+            self._log(name, before)
+
+    def release(self):
+        self.space.release()
+        self.by_type.clear()
+        self._kinds.clear()
+
+    # trace -----------------------------------------------------------
+    def _log(self, name: str, before: float):
+        total = self.space.total
+        delta = total - before
+        if not delta:
+            return
+        code = self.types.get(name)
+        if code is None:
+            code = self.types[name] = len(self.types)
+        self.by_type[name] += delta
+        if total >= self.space.max_seen:
+            self.peak_by_type = {k: v for k, v in self.by_type.items() if v}
+        self.buffer[self.written % self.capacity] = (self.kolmo.steps, total, delta, code)
+        self.written += 1
+
+    def rows(self) -> np.ndarray:
+        """The retained rows, oldest first."""
+        if self.written <= self.capacity:
+            return self.buffer[:self.written].copy()
+        i = self.written % self.capacity
+        return np.concatenate([self.buffer[i:], self.buffer[:i]])
+
+    def type_names(self) -> List[str]:
+        return sorted(self.types, key=self.types.get)
+
+    def to_npz(self, path):
+        rows = self.rows()
+        np.savez(path, step=rows["step"], total=rows["total"], delta=rows["delta"],
+                 type=rows["type"], type_names=np.array(self.type_names()))
+
+    def to_frame(self):
+        import pandas as pd
+        rows = self.rows()
+        frame = pd.DataFrame({name: rows[name] for name in ("step", "total", "delta")})
+        frame["structure"] = pd.Categorical.from_codes(rows["type"], self.type_names())
+        return frame
+
+class CallTrace:
+    """
+    Columnar log of primitive calls -- primitive id (see PRIMITIVES), weight,
+    lexicon size at call time (-1 if the call got no lexicon), nesting depth
+    and the row of the enclosing call (-1 at top level) -- in a NumPy buffer
+    that doubles when full. Rows are in call order: a call's row is opened
+    before its body runs and its weight filled in afterwards (NaN if it
+    raised).
+    """
+    DTYPE = np.dtype([("pid", "i4"), ("weight", "f8"), ("size", "i8"), ("depth", "i2"), ("parent", "i8")])
+
+    def __init__(self, capacity: int = 1024):
+        self.buffer = np.zeros(max(capacity, 1), dtype=self.DTYPE)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def append(self, pid: int, weight: float, size: int, depth: int, parent: int, times: int = 1) -> int:
+        """Add `times` identical rows; returns the index of the first."""
+        start, end = self.n, self.n + times
+        if end > len(self.buffer):
+            grown = np.zeros(max(end, 2 * len(self.buffer)), dtype=self.DTYPE)
+            grown[:self.n] = self.buffer[:self.n]
+            self.buffer = grown
+        self.buffer[start:end] = (pid, weight, size, depth, parent)
+        self.n = end
+        return start
+
+    def rows(self) -> np.ndarray:
+        return self.buffer[:self.n]
+
+def export_call_traces(traces: List[CallTrace], path):
+    """
+    Write the traces of a batch of runs in one bulk write, with a `run`
+    column (`parent` indexes rows within the same run); .csv goes through
+    pandas with primitive names spelled out, anything else is written as
+    .npz.
+    """
+    rows = np.concatenate([t.rows() for t in traces]) if traces else np.zeros(0, CallTrace.DTYPE)
+    run = np.repeat(np.arange(len(traces)), [len(t) for t in traces])
+    columns = {"run": run, **{name: rows[name] for name in CallTrace.DTYPE.names}}
+    if str(path).endswith(".csv"):
+        import pandas as pd
+        frame = pd.DataFrame(columns)
+        frame["primitive"] = np.array(list(PRIMITIVES), dtype=object)[frame["pid"]]
+        frame.to_csv(path, index=False)
+    else:
+        np.savez(path, primitives=np.array(list(PRIMITIVES)), **columns)
+
+class Kolmo:
+    def __init__(self, call_trace: int = 0):
         self.counts = defaultdict(int)
         self.total = 0.0
+        self.steps = 0
+        self.depth = 0
+        # row of the innermost traced call still running
+        self.parent = -1
+        self.calls: Optional[CallTrace] = CallTrace(call_trace) if call_trace else None
+
+    def record(self, pf_name: str, weight: float, times: int = 1):
+        self.counts[pf_name] += times
+        self.total += float(weight) * times
+        self.steps += times
+        if self.calls is not None:
+            self.calls.append(register_primitive(pf_name), weight, -1, self.depth, self.parent, times)
 
-    def record(self, pf_name: str, weight: float):
+    def enter(self, pf_name: str, size: int = -1) -> int:
+        """Open a traced call's row before its body runs."""
+        row = self.calls.append(register_primitive(pf_name), np.nan, size, self.depth, self.parent)
+        self.depth += 1
+        self.parent = row
+        return row
+
+    def exit(self, row: int, pf_name: str, weight: Optional[float]):
+        """Close the row from enter(); weight is None if the call raised."""
+        self.depth -= 1
+        self.parent = int(self.calls.buffer["parent"][row])
+        if weight is None:
+            return
         self.counts[pf_name] += 1
         self.total += float(weight)
+        self.steps += 1
+        self.calls.buffer["weight"][row] = weight
+
+SEED = 42
+
+class RunRNG:
+    """
+    A run's private random stream, rooted in a numpy SeedSequence so a seed
+    can be split into independent child streams. With block > 0, uniforms
+    are pre-drawn from a NumPy generator `block` at a time instead of one
+    Python call per draw.
+    """
+    __slots__ = ("seed_seq", "block", "_py", "_gen", "_buf", "_i")
+
+    def __init__(self, seed = None, *, block: int = 0):
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        self.block = block
+        if block:
+            self._gen = np.random.default_rng(seed)
+            self._buf = self._gen.random(block)
+            self._i = 0
+        else:
+            self._py = random.Random(int.from_bytes(seed.generate_state(4).tobytes(), "little"))
+
+    def random(self) -> float:
+        if not self.block:
+            return self._py.random()
+        if self._i == self.block:
+            self._buf = self._gen.random(self.block)
+            self._i = 0
+        u = self._buf[self._i]
+        self._i += 1
+        return float(u)
+
+    def randbelow(self, n: int) -> int:
+        if not self.block:
+            return self._py.randrange(n)
+        return int(self.random() * n)
+
+    def choice(self, seq):
+        if not len(seq):
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[self.randbelow(len(seq))]
+
+    def spawn(self, n: int) -> list["RunRNG"]:
+        return [RunRNG(child, block=self.block) for child in self.seed_seq.spawn(n)]
+
+# used outside any run, and to seed runs that were not given a seed
+DEFAULT_RNG = RunRNG(SEED)
+
+def _root_seed(seed) -> np.random.SeedSequence:
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if seed is None:
+        seed = DEFAULT_RNG.randbelow(2**63)
+    return np.random.SeedSequence(seed)
 
 class RunScope:
-    def __init__(self):
-        self.space = Space()
-        self.kolmo = Kolmo()
+    """
+    Per-run state. A scope is normally touched only by its own run, so it
+    gets a lock-free Space; pass shared=True if it is handed to other
+    threads, or peak_only=True when only max_seen is needed.
+    space_trace=N records the last N Space changes (see SpaceTrace), and
+    call_trace=N logs every primitive call into a CallTrace of initial size N.
+    encode_sequences=True makes every Sequence created in the run an encoded
+    one (token ids only).
+    In arena mode (the default) each structure created while the scope is
+    active purges itself from Space when it dies, and `release()` closes
+    the scope so anything still alive is dropped in bulk; arena=False uses
+    one weakref.finalize per object instead. Both modes charge a structure
+    exactly while it is alive, so they report the same Space.
+    """
+    def __init__(self, seed = None, *, rng_block: int = 0, shared: bool = False, peak_only: bool = False,
+                 arena: bool = True, space_trace: int = 0, call_trace: int = 0,
+                 encode_sequences: bool = False):
+        if peak_only and not arena:
+            raise ValueError("peak_only scopes need arena=True")
+        self.arena = arena
+        self.open = True
+        if shared:
+            self.space = Space()
+        elif peak_only:
+            self.space = PeakSpace()
+        else:
+            self.space = LocalSpace()
+        self.kolmo = Kolmo(call_trace)
+        if space_trace:
+            self.space = SpaceTrace(self.space, self.kolmo, space_trace)
+        self.rng = RunRNG(_root_seed(seed), block=rng_block)
+        self.encode_sequences = encode_sequences
+
+    def release(self):
+        """End of run: drop every owned structure and its Space entry in bulk."""
+        self.open = False
+        self.space.release()
 
 @dataclass
 class RunSnapshot:
     mdl: int
     k_complexity_breakdown: Dict[str, int]
     space_complexity: float
+    # filled only for runs with a space trace
+    peak_breakdown: Dict[str, float] = field(default_factory=dict)
+    space_trace: Optional[SpaceTrace] = None
+    # filled only for runs with a call trace
+    call_trace: Optional[CallTrace] = None
 
 class Complexity:
     def __init__(self):
@@ -64,9 +424,9 @@ class Complexity:
         self.end: Optional[RunSnapshot] = None
 
     @contextmanager
-    def activate(self):
+    def activate(self, seed = None, **scope_options):
         parent = _CURRENT_RUN.get()
-        scope = RunScope()
+        scope = RunScope(seed, **scope_options)
         token = _CURRENT_RUN.set(scope)
         try:
             yield
@@ -74,11 +434,16 @@ class Complexity:
             _CURRENT_RUN.reset(token)
             if parent is not None:
                 _CURRENT_RUN.set(parent)
+            trace = scope.space if isinstance(scope.space, SpaceTrace) else None
             snap = RunSnapshot(
                 mdl=scope.kolmo.total,
                 k_complexity_breakdown=dict(scope.kolmo.counts),
                 space_complexity=scope.space.max_seen,
+                peak_breakdown=dict(trace.peak_by_type) if trace else {},
+                space_trace=trace,
+                call_trace=scope.kolmo.calls,
             )
+            scope.release()
             self.runs.append(snap)
             self.last = snap
 
@@ -112,12 +477,18 @@ def cognitive_function():
       - Create a fresh Complexity/RunScope
       - Auto-register top-level Mem objects in args/kwargs
       - Return (result, complexity)
+    Pass seed=... to give the run its own reproducible random stream,
+    space_trace=N to keep a SpaceTrace of its last N Space changes, and
+    call_trace=N to log its primitive calls into a CallTrace, and
+    encode_sequences=True to get the output back as an encoded Sequence.
     """
     def deco(fn):
         @wraps(fn)
-        def wrapped(*args, **kwargs):
+        def wrapped(*args, seed = None, space_trace: int = 0, call_trace: int = 0,
+                    encode_sequences: bool = False, **kwargs):
             comp = Complexity()
-            with comp.activate():
+            with comp.activate(seed, space_trace=space_trace, call_trace=call_trace,
+                               encode_sequences=encode_sequences):
                 scope = _CURRENT_RUN.get()
                 if scope is not None:
                     seen = set()
@@ -134,4 +505,80 @@ def cognitive_function():
                 result = fn(*args, **kwargs)
             return result, comp
         return wrapped
-    return deco
\ No newline at end of file
+    return deco
+
+@dataclass
+class BatchResult:
+    """Struct-of-arrays outcome of `run_batch`; one row per run."""
+    mdl: np.ndarray
+    space_complexity: np.ndarray
+    counts: np.ndarray
+    primitives: List[str]
+    sequences: Optional[List[np.ndarray]] = None
+    call_traces: Optional[List[CallTrace]] = None
+    # the interned keys behind `sequences`, so their ids stay decodable
+    _pins: Optional[List[set]] = field(default=None, repr=False)
+
+    def count(self, pf_name: str) -> np.ndarray:
+        """Per-run call counts of one primitive."""
+        return self.counts[:, self.primitives.index(pf_name)]
+
+def _encode_sequence(result):
+    """A run's output as (uint32 token ids, the interned keys they need)."""
+    if getattr(result, "ids", None) is not None:
+        return result.tids(), result._pins
+    tokens = list(getattr(result, "items", result))
+    return np.fromiter((t.tid for t in tokens), dtype=np.uint32), {t._interned for t in tokens}
+
+def run_batch(fn: Callable, template, n_runs: int, *, seed = None, rng_block: int = 0,
+              keep_sequences: bool = False, call_trace: int = 0) -> BatchResult:
+    """
+    Run a @cognitive_function `n_runs` times, each on a fresh `template.copy()`.
+    Each run gets a bare RunScope rather than a Complexity/RunSnapshot, and
+    its totals are written straight into the result arrays. Run i draws from
+    the i-th child stream of `seed`. Output Sequences are encoded, so
+    keep_sequences=True keeps one uint32 array of token ids per run, which
+    memory.decode_tokens can decode while the BatchResult is alive. call_trace=N keeps each run's CallTrace (see
+    export_call_traces).
+    """
+    run = getattr(fn, "__wrapped__", fn)
+    children = _root_seed(seed).spawn(n_runs)
+    mdl = np.zeros(n_runs)
+    space = np.zeros(n_runs)
+    rows: list = []
+    sequences = [] if keep_sequences else None
+    pins = [] if keep_sequences else None
+    traces = [] if call_trace else None
+    for i in range(n_runs):
+        lexicon = template.copy()
+        scope = RunScope(children[i], rng_block=rng_block, peak_only=True, call_trace=call_trace,
+                         encode_sequences=True)
+        token = _CURRENT_RUN.set(scope)
+        try:
+            scope.space.register(lexicon, lexicon.compute_weight())
+            result = run(lexicon)
+        finally:
+            _CURRENT_RUN.reset(token)
+        mdl[i] = scope.kolmo.total
+        space[i] = scope.space.max_seen
+        scope.release()
+        rows.append([(register_primitive(name), c) for name, c in scope.kolmo.counts.items()])
+        if keep_sequences:
+            ids, held = _encode_sequence(result)
+            sequences.append(ids)
+            pins.append(held)
+        if call_trace:
+            traces.append(scope.kolmo.calls)
+    counts = np.zeros((n_runs, len(PRIMITIVES)), dtype=np.int64)
+    for i, row in enumerate(rows):
+        for pid, c in row:
+            counts[i, pid] = c
+    return BatchResult(
+        mdl=mdl,
+        space_complexity=space,
+        counts=counts,
+        primitives=list(PRIMITIVES),
+        sequences=sequences,
+        call_traces=traces,
+        _pins=pins,
+    )
@@ -0,0 +1,116 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+import model.memory as mem
+
+@dataclass(frozen=True)
+class LexiconSpec:
+    """
+    Compact, picklable description of a synthetic lexicon, parameterised
+    like theoretical.py: `n` tokens whose attribute1 takes `divs` values,
+    and for dims=2 an attribute2 that takes n/divs values (a full grid).
+    skew > 0 makes the attribute1 groups Zipf-like instead of equal, with
+    group g holding about n / (g + 1)**skew tokens and at least one; in 2D
+    attribute2 is then a token's rank within its group.
+    """
+    n: int
+    divs: int
+    dims: int = 1
+    backend: str = "graph"
+    skew: float = 0.0
+
+    def __post_init__(self):
+        if self.dims not in (1, 2):
+            raise ValueError(f"dims must be 1 or 2, got {self.dims}")
+        if self.skew < 0:
+            raise ValueError(f"skew must be >= 0, got {self.skew}")
+        if self.skew and self.n < self.divs:
+            raise ValueError(f"n={self.n} is too small for divs={self.divs} groups")
+        if not self.skew and self.n % self.divs:
+            raise ValueError(f"n={self.n} is not divisible by divs={self.divs}")
+        if self.backend not in ("graph", "compact"):
+            raise ValueError(f"unknown backend {self.backend!r}")
+
+    def group_sizes(self) -> List[int]:
+        """Number of tokens carrying each attribute1 value, largest first."""
+        if not self.skew:
+            return [self.n // self.divs] * self.divs
+        weights = 1.0 / np.arange(1, self.divs + 1) ** self.skew
+        raw = (self.n - self.divs) * weights / weights.sum()
+        sizes = np.floor(raw).astype(int)
+        # largest remainders take the leftover tokens, ties to the bigger group
+        leftover = self.n - self.divs - sizes.sum()
+        sizes[np.argsort(sizes - raw, kind="stable")[:leftover]] += 1
+        return [int(s) + 1 for s in sizes]
+
+    def columns(self):
+        # groups are interleaved by rank, so balanced specs give token i
+        # attribute1 a{i % divs} and attribute2 b{i // divs}
+        sizes = self.group_sizes()
+        attribute1, attribute2 = [], []
+        for rank in range(max(sizes)):
+            for group, size in enumerate(sizes):
+                if rank < size:
+                    attribute1.append(f"a{group}")
+                    attribute2.append(f"b{rank}")
+        names = [f"t{i}" for i in range(self.n)]
+        return names, attribute1, attribute2 if self.dims == 2 else None
+
+    def construct(self, *, track: bool = True):
+        """Build the lexicon from scratch, bypassing the template cache."""
+        names, attribute1, attribute2 = self.columns()
+        if self.backend == "compact":
+            return mem.CompactLexicon.from_columns(
+                names, attribute1=attribute1, attribute2=attribute2, track=track
+            )
+        attribute2 = attribute2 or [None] * self.n
+        return mem.Lexicon(tokens=[
+            mem.Token(name=a, attribute1=b, attribute2=c, track=False)
+            for a, b, c in zip(names, attribute1, attribute2)
+        ], track=track)
+
+    def template(self) -> LexiconTemplate:
+        return compile_spec(self)
+
+    def build(self, *, track: bool = True):
+        """A fresh mutable lexicon, stamped from this spec's cached template."""
+        return compile_spec(self).stamp(track=track)
+
+class LexiconTemplate:
+    """
+    A LexiconSpec compiled once into an untracked lexicon that is never
+    handed out. stamp() returns fresh mutable copies that share its Tokens
+    but own their graph, indexes and membership.
+    """
+    __slots__ = ("spec", "_base")
+
+    def __init__(self, spec: LexiconSpec):
+        self.spec = spec
+        self._base = spec.construct(track=False)
+
+    def __len__(self):
+        return self.spec.n
+
+    def __repr__(self):
+        return f"LexiconTemplate({self.spec!r})"
+
+    def stamp(self, *, track: bool = True):
+        return self._base.copy(track=track)
+
+    def stamp_many(self, k: int, *, track: bool = True) -> list:
+        base = self._base
+        return [base.copy(track=track) for _ in range(k)]
+
+@lru_cache(maxsize=256)
+def compile_spec(spec: LexiconSpec) -> LexiconTemplate:
+    """The (per-process, cached) template for `spec`."""
+    return LexiconTemplate(spec)
+
+def make_lexicon(n: int, divs: int, dims: int = 1, *, skew: float = 0.0,
+                 backend: str = "graph", track: bool = True):
+    """Shorthand for LexiconSpec(n, divs, dims, backend, skew).build(track=track)."""
+    return LexiconSpec(n, divs, dims, backend, skew).build(track=track)
@@ -1,32 +1,94 @@
 from __future__ import annotations
-from contextvars import ContextVar
+import itertools
 import weakref
 from dataclasses import dataclass
 from typing import Optional, Iterable, Set, List, Dict, Union
 from collections import deque
+from array import array
+from collections.abc import MutableSet
+from bisect import bisect_left
 import networkx as nx
+import numpy as np
 from copy import deepcopy
 
-_CURRENT_RUN: ContextVar = ContextVar("_CURRENT_RUN", default=None)
+from model.complexity import _CURRENT_RUN
+
+class _Interned:
+    """
+    An interned identity key and its token id. Tokens, and encoded
+    sequences holding the id, keep it alive; the tables below only hold it
+    weakly, so a key is forgotten once nothing refers to it.
+    """
+    __slots__ = ("key", "tid", "__weakref__")
+
+    def __init__(self, key: tuple, tid: int):
+        self.key, self.tid = key, tid
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_intern_token, (self.key,))
+
+# identity key (name, attribute1, attribute2, ordinate, linked) -> interned
+# id, and back; ids are only meaningful in the process that interned them
+# and are never reused, so a stale id fails to decode instead of decoding
+# to another token
+_TOKEN_IDS: "weakref.WeakValueDictionary[tuple, _Interned]" = weakref.WeakValueDictionary()
+_TOKEN_KEYS: "weakref.WeakValueDictionary[int, _Interned]" = weakref.WeakValueDictionary()
+_NEXT_TID = itertools.count()
+
+def _intern_token(key: tuple) -> _Interned:
+    interned = _TOKEN_IDS.get(key)
+    if interned is None:
+        interned = _TOKEN_IDS[key] = _Interned(key, next(_NEXT_TID))
+        _TOKEN_KEYS[interned.tid] = interned
+    return interned
+
+def _interned(tid: int) -> _Interned:
+    interned = _TOKEN_KEYS.get(tid)
+    if interned is None:
+        raise KeyError(f"token id {tid} is no longer interned: no token or sequence holds it")
+    return interned
+
+def token_key(tid: int) -> tuple:
+    """The (name, attribute1, attribute2, ordinate, linked) key of a live token id."""
+    return _interned(tid).key
 
 class MemoryStructure:
     """
     Base class for memory-tracked objects.
     Set track=False to opt out of automatic Space bookkeeping.
     """
-    __slots__ = ("_finalizer", "_track", "__weakref__")
+    __slots__ = ("_finalizer", "_home", "_track", "_space", "_space_w", "__weakref__")
 
     def __init__(self, *, track: bool = True):
         self._track = bool(track)
+        self._adopt()
 
-        if self._track:
-            scope = _CURRENT_RUN.get()
-            if scope is not None:
-                scope.space.register(self, self.compute_weight())
-            # Only finalize/purge if we're tracking
-            self._finalizer = weakref.finalize(self, MemoryStructure._on_finalize, weakref.ref(self))
+    def _adopt(self):
+        """
+        Register with the active run. In arena mode the object remembers its
+        scope and purges itself in __del__ while the scope is open; otherwise
+        a weakref.finalize does the same. Either way a structure stops
+        counting in Space as soon as it is garbage.
+        """
+        self._finalizer = self._home = None
+        if not self._track:
+            return
+        scope = _CURRENT_RUN.get()
+        if scope is None:
+            return
+        scope.space.register(self, self.compute_weight())
+        if scope.arena:
+            self._home = scope
         else:
-            self._finalizer = None
+            self._finalizer = weakref.finalize(
+                self, MemoryStructure._on_finalize, weakref.ref(scope.space), id(self)
+            )
     
     def __deepcopy__(self, memo):
         # Create a new instance
@@ -37,28 +99,29 @@ class MemoryStructure:
         # Copy over all attributes
         if hasattr(self, "__slots__"):
             for slot in self.__slots__:
-                if hasattr(self, slot):
+                if hasattr(self, slot) and slot not in ("_finalizer", "_home", "_space", "_space_w"):
                     setattr(new_obj, slot, deepcopy(getattr(self, slot), memo))
         else:
             for k, v in self.__dict__.items():
                 setattr(new_obj, k, deepcopy(v, memo))
 
         # Re-register the new object if tracking is enabled
-        if getattr(self, "_track", True):
-            scope = _CURRENT_RUN.get()
-            if scope is not None:
-                scope.space.register(new_obj, new_obj.compute_weight())
+        new_obj._track = getattr(self, "_track", True)
+        new_obj._adopt()
 
         return new_obj
 
+    def __del__(self):
+        # unset on objects built with __new__ and never adopted
+        scope = getattr(self, "_home", None)
+        if scope is not None and scope.open:
+            scope.space.purge(self)
+
     @staticmethod
-    def _on_finalize(self_ref):
-        obj = self_ref()
-        if obj is None or not getattr(obj, "_track", False):
-            return
-        scope = _CURRENT_RUN.get()
-        if scope is not None:
-            scope.space.purge(obj)
+    def _on_finalize(space_ref, oid):
+        space = space_ref()
+        if space is not None:
+            space.purge_id(oid)
 
     def compute_weight(self) -> float:
         """Override in subclasses to return current weight."""
@@ -83,11 +146,14 @@ class MemoryStructure:
 class Token(MemoryStructure):
     """
     A token that can participate in a lexicon.
+    Tokens with the same name, attributes, ordinate and linkage share an
+    interned `tid`, which is all that hashing and equality look at; those
+    fields are fixed at construction.
     """
     __slots__ = (
         "name", "attribute1", "attribute2",
         "predecessors", "successors", "ordinate", "linked",
-        "_track",
+        "tid", "_interned", "_track",
     )
 
     def __init__(
@@ -108,57 +174,141 @@ class Token(MemoryStructure):
         self.successors: Set[Token] = set(successors or [])
         self.ordinate = float(ordinate) if ordinate is not None else None
         self.linked = bool(self.predecessors or self.successors)
+        self._interned = _intern_token(
+            (name, attribute1, attribute2, self.ordinate, self.linked)
+        )
+        self.tid = self._interned.tid
         super().__init__(**kwargs)
 
+    @classmethod
+    def from_id(cls, tid: int, *, track: bool = False) -> "Token":
+        """
+        A fresh Token for a live interned id. Only the `linked` flag
+        survives, not the predecessor and successor sets themselves.
+        """
+        token = cls.__new__(cls)
+        token._interned = _interned(tid)
+        (token.name, token.attribute1, token.attribute2,
+         token.ordinate, token.linked) = token._interned.key
+        token.predecessors, token.successors = set(), set()
+        token.tid = tid
+        MemoryStructure.__init__(token, track=track)
+        return token
+
     def __repr__(self):
         return f"Token({self.name!r}, linked={self.linked}, ord={self.ordinate})"
 
     def __hash__(self):
-        # Only immutable values can go into a hash. Convert lists to tuples of names.
-        return hash(
-            (
-                self.name,
-                self.linked,
-                self.ordinate,
-                self.attribute1,
-                self.attribute2,
-                tuple(t.name for t in self.predecessors),
-                tuple(t.name for t in self.successors),
-            )
-        )
+        return self.tid
 
     def __eq__(self, other):
         if not isinstance(other, Token):
             return False
-        return (
-            self.name == other.name
-            and self.linked == other.linked
-            and self.ordinate == other.ordinate
-            and self.attribute1 == other.attribute1
-            and self.attribute2 == other.attribute2
-        )
+        return self.tid == other.tid
 
     def compute_weight(self):
         weight_params = [self.attribute1, self.attribute2, self.predecessors, self.successors, self.ordinate]
         weight =  sum(1 for v in weight_params if v is not None)
         return weight
 
+class IndexedSet(MutableSet):
+    """
+    A set with O(1) add, remove, membership and positional access.
+    Items sit in a dense list in insertion order; removing one swaps the
+    last item into its slot, so `random.choice` works without a copy and
+    iteration order never depends on hash randomization.
+    """
+    __slots__ = ("_items", "_pos")
+
+    def __init__(self, items = None):
+        self._items: list = []
+        self._pos: dict = {}
+        for item in items or ():
+            self.add(item)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def __repr__(self):
+        return f"IndexedSet({self._items!r})"
+
+    def get(self, item, default = None):
+        """The stored member equal to `item`."""
+        i = self._pos.get(item)
+        return default if i is None else self._items[i]
+
+    def add(self, item):
+        if item not in self._pos:
+            self._pos[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item):
+        i = self._pos.pop(item, None)
+        if i is None:
+            return
+        last = self._items.pop()
+        if i < len(self._items):
+            self._items[i] = last
+            self._pos[last] = i
+
+    def remove(self, item):
+        if item not in self._pos:
+            raise KeyError(item)
+        self.discard(item)
+
+def _copy_graph(G: nx.MultiDiGraph) -> nx.MultiDiGraph:
+    """
+    G.copy() for a MultiDiGraph, done on the adjacency dicts directly
+    instead of re-adding every edge. Each copied key-dict is shared between
+    the successor and predecessor maps, as networkx does, and both keep
+    their original order. This reads networkx's private _node/_succ/_pred,
+    so requirements.txt pins networkx 3.x.
+    """
+    H = G.__class__()
+    H.graph.update(G.graph)
+    for n, data in G._node.items():
+        H._node[n] = data.copy()
+    for u, nbrs in G._succ.items():
+        H._succ[u] = {v: {k: d.copy() for k, d in keydict.items()} for v, keydict in nbrs.items()}
+    succ = H._succ
+    for v, nbrs in G._pred.items():
+        H._pred[v] = {u: succ[u][v] for u in nbrs}
+    return H
+
 class Lexicon(MemoryStructure):
-    __slots__ = ("tokens", "_G", "dimension", "linked", "ordered")
+    __slots__ = ("tokens", "_G", "dimension", "linked", "ordered", "_ordinals", "_n_linked", "_n_edges", "_index", "_by_name")
+
+    INDEXED = ("attribute1", "attribute2", "ordinate")
 
     def __init__(self, tokens = None, *, 
                 linked = False, ordered = False, **kwargs):
-        self.tokens: Set[Token] = set(tokens or [])
+        self.tokens: IndexedSet = IndexedSet(tokens)
+        self._by_name: Dict[str, Token] = {}
+        for t in self.tokens:
+            self._claim_name(t)
         self.linked = linked
         self.ordered = ordered
-        self._G = self._build_graph()
+        self._n_linked = sum(1 for t in self.tokens if t.linked)
+        self._index: Dict[str, Dict] = {attribute: {} for attribute in self.INDEXED}
+        for t in self.tokens:
+            self._index_add(t)
+        self._rebuild()
         super().__init__(**kwargs)
     
     def __iter__(self):
         return iter(self.tokens)
 
     def compute_weight(self) -> float:
-        return float(len(self.tokens) + self._G.number_of_edges())
+        return float(len(self.tokens) + self._n_edges)
 
     def __bool__(self):
         return bool(self.tokens)
@@ -194,56 +344,221 @@ class Lexicon(MemoryStructure):
                 G.add_edge(u, v)
         return G
 
+    def _rebuild(self):
+        """Full rebuild of the graph and the sorted ordinate chain."""
+        self._G = self._build_graph()
+        self._n_edges = self._G.number_of_edges()
+        self._ordinals = sorted(
+            n for n, data in self._G.nodes(data=True) if data.get("type") == "ordinate"
+        ) if self.ordered else []
+
+    def _drop_edge(self, u, v, label = None):
+        """Remove a single (u, v) edge carrying `label` from the multigraph."""
+        for key, data in self._G[u][v].items():
+            if data.get("label") == label:
+                self._G.remove_edge(u, v, key)
+                self._n_edges -= 1
+                return
+
+    def _add_edge(self, u, v, label = None):
+        if label is None:
+            self._G.add_edge(u, v)
+        else:
+            self._G.add_edge(u, v, label = label)
+        self._n_edges += 1
+
+    def _is_ordinate(self, node) -> bool:
+        return node in self._G and self._G.nodes[node].get("type") == "ordinate"
+
+    def _attach(self, token):
+        """Add one token's node and edges to the live graph."""
+        G = self._G
+        new_ordinate = bool(token.ordinate) and not self._is_ordinate(token.ordinate)
+        self._token_vet(token, G)
+        self._n_edges += bool(token.attribute1) + bool(token.attribute2) + bool(token.ordinate)
+        if self._n_linked:
+            for p in token.predecessors:
+                self._add_edge(p.name, token.name, label = "linked")
+            for s in token.successors:
+                self._add_edge(token.name, s.name, label = "linked")
+        if self.ordered and new_ordinate:
+            i = bisect_left(self._ordinals, token.ordinate)
+            lower = self._ordinals[i - 1] if i > 0 else None
+            upper = self._ordinals[i] if i < len(self._ordinals) else None
+            if lower is not None and upper is not None:
+                self._drop_edge(lower, upper)
+            if lower is not None:
+                self._add_edge(lower, token.ordinate)
+            if upper is not None:
+                self._add_edge(token.ordinate, upper)
+            self._ordinals.insert(i, token.ordinate)
+
+    def _detach(self, token):
+        """Drop one token's edges, then any node nothing else points at."""
+        G = self._G
+        name = token.name
+        touched = []
+        for attribute in (token.attribute1, token.attribute2):
+            if attribute:
+                self._drop_edge(name, attribute)
+                touched.append(attribute)
+        if self._n_linked:
+            for p in token.predecessors:
+                self._drop_edge(p.name, name, label = "linked")
+                touched.append(p.name)
+            for s in token.successors:
+                self._drop_edge(name, s.name, label = "linked")
+                touched.append(s.name)
+        if token.ordinate:
+            ordinate = token.ordinate
+            self._drop_edge(ordinate, name)
+            still_used = any(
+                G.nodes[n].get("type") != "ordinate" for n in G.successors(ordinate)
+            )
+            if not still_used:
+                if self.ordered:
+                    i = bisect_left(self._ordinals, ordinate)
+                    lower = self._ordinals[i - 1] if i > 0 else None
+                    upper = self._ordinals[i + 1] if i + 1 < len(self._ordinals) else None
+                    if lower is not None:
+                        self._drop_edge(lower, ordinate)
+                    if upper is not None:
+                        self._drop_edge(ordinate, upper)
+                    if lower is not None and upper is not None:
+                        self._add_edge(lower, upper)
+                    del self._ordinals[i]
+                G.remove_node(ordinate)
+        # the token's own node survives only as a bare link target
+        if G.degree(name) == 0:
+            G.remove_node(name)
+        else:
+            G.nodes[name].clear()
+        for node in touched:
+            if node in G and G.degree(node) == 0 and G.nodes[node].get("type") != "token":
+                G.remove_node(node)
+
+    def _claim_name(self, token):
+        held = self._by_name.setdefault(token.name, token)
+        if held is not token:
+            raise ValueError(
+                f"Lexicon already holds a different token named {token.name!r}: "
+                f"{held!r} vs {token!r}"
+            )
+
+    def _index_add(self, token):
+        for attribute, buckets in self._index.items():
+            value = getattr(token, attribute)
+            if value:
+                buckets.setdefault(value, {})[token] = None
+
+    def _index_remove(self, token):
+        for attribute, buckets in self._index.items():
+            value = getattr(token, attribute)
+            if value:
+                bucket = buckets[value]
+                del bucket[token]
+                if not bucket:
+                    del buckets[value]
+
+    def lookup(self, attribute, value):
+        """Live view of the tokens whose `attribute` equals `value`."""
+        buckets = self._index.get(attribute)
+        if buckets is None or value not in buckets:
+            return ()
+        return buckets[value].keys()
+
+    def lookup_other(self, attribute, value) -> List[Token]:
+        """Tokens that carry `attribute` with any value other than `value`."""
+        buckets = self._index.get(attribute, {})
+        out = []
+        for v, bucket in buckets.items():
+            if v != value:
+                out.extend(bucket)
+        return out
+
+    def values(self, attribute):
+        """The distinct values of `attribute` currently held in the lexicon."""
+        return self._index.get(attribute, {}).keys()
+
     @property
     def G(self) -> nx.DiGraph:
         """Access the materialized lexicon."""
         return self._G
 
     def add_token(self, new_token):
-        added = False
-        if new_token not in self.tokens:
-            self.tokens.add(new_token)
-            added = True
-        if added:
-            self._G = self._build_graph()
-            self._changed()
+        if new_token in self.tokens:
+            return
+        self._claim_name(new_token)
+        self.tokens.add(new_token)
+        self._index_add(new_token)
+        if new_token.linked:
+            self._n_linked += 1
+            if self._n_linked == 1:
+                # linked edges switch on for every token at once
+                self._rebuild()
+                self._changed()
+                return
+        self._attach(new_token)
+        self._changed()
 
     def remove_token(self, drop_token):
-        removed = False
-        if drop_token in self.tokens:
-            self.tokens.remove(drop_token)
-            removed = True
-        if removed:
-            self._G = self._build_graph()
-            self._changed()
+        drop_token = self.tokens.get(drop_token)
+        if drop_token is None:
+            return
+        self.tokens.remove(drop_token)
+        del self._by_name[drop_token.name]
+        self._index_remove(drop_token)
+        if drop_token.linked:
+            self._n_linked -= 1
+            if self._n_linked == 0:
+                self._rebuild()
+                self._changed()
+                return
+        self._detach(drop_token)
+        self._changed()
     
     def get_token(self, token):
-        token = next((t for t in self.tokens if t.name == token), None)
-        if token:
-            return token
-        else:
-            return None
+        return self._by_name.get(token)
+
+    def copy(self, *, track: bool = True) -> "Lexicon":
+        """Fresh mutable lexicon over the same (shared) Token objects."""
+        new = Lexicon.__new__(Lexicon)
+        new.tokens = IndexedSet()
+        new.tokens._items = list(self.tokens._items)
+        new.tokens._pos = dict(self.tokens._pos)
+        new._by_name = dict(self._by_name)
+        new._index = {
+            attribute: {v: dict(bucket) for v, bucket in buckets.items()}
+            for attribute, buckets in self._index.items()
+        }
+        new.linked = self.linked
+        new.ordered = self.ordered
+        new._n_linked = self._n_linked
+        new._G = _copy_graph(self._G)
+        new._n_edges = self._n_edges
+        new._ordinals = list(self._ordinals)
+        MemoryStructure.__init__(new, track=track)
+        return new
 
+    def subset(self, names, *, track: bool = True) -> "Lexicon":
+        """A new Lexicon over this lexicon's tokens with the given names."""
+        by_name = self._by_name
+        return Lexicon(
+            tokens=[by_name[n] for n in names if n in by_name],
+            linked=self.linked, ordered=self.ordered, track=track,
+        )
 
     def successors(self, token: Token) -> List[Token]:
         if token not in self.tokens:
             return []
-        out = []
-        for n in self._G.successors(token.name):
-            data = self._G.nodes[n]
-            if data.get("type") == "token":
-                out.append(data["token"])
-        return out
+        by_name = self._by_name
+        return [by_name[n] for n in self._G.successors(token.name) if n in by_name]
 
     def predecessors(self, token: Token) -> List[Token]:
         if token not in self.tokens:
             return []
-        out = []
-        for n in self._G.predecessors(token.name):
-            data = self._G.nodes[n]
-            if data.get("type") == "token":
-                out.append(data["token"])
-        return out
+        by_name = self._by_name
+        return [by_name[n] for n in self._G.predecessors(token.name) if n in by_name]
     
     @property
     def ordinates(self): 
@@ -266,7 +581,16 @@ class Lexicon(MemoryStructure):
     @classmethod
     def from_nx(cls, G: nx.DiGraph, *, track: bool = True) -> "Lexicon":
         """Reconstruct a Lexicon (and fresh Tokens) from a NetworkX subgraph."""
-        # 1) Build Token objects for every token node
+        # 1) Collect ordinates from token -> ("ord", value) edges; a token's
+        #    ordinate is part of its identity, so it must be known up front
+        ordinates: dict[str, float] = {}
+        for u, v, ed in G.edges(data=True):
+            if ed.get("label") == "has_ordinate":
+                # v should be ("ord", value)
+                if isinstance(v, tuple) and len(v) == 2 and v[0] == "ord":
+                    ordinates[u] = float(v[1])
+
+        # 2) Build Token objects for every token node
         tokens_by_name: dict[str, Token] = {}
         for n, data in G.nodes(data=True):
             if data.get("type") == "token":
@@ -276,28 +600,19 @@ class Lexicon(MemoryStructure):
                     attribute2=data.get("attribute2"),
                     predecessors=[],   # filled next
                     successors=[],     # filled next
-                    ordinate=None,     # filled next (if any)
+                    ordinate=ordinates.get(n),
                     track=False,       # delay tracking to Lexicon instance
                 )
                 tokens_by_name[n] = t
 
-        # 2) Wire token→token edges (successors/predecessors)
+        # 3) Wire token→token edges (successors/predecessors)
         for u, v, ed in G.edges(data=True):
             if ed.get("label") == "token_edge":
                 tu = tokens_by_name.get(u)
                 tv = tokens_by_name.get(v)
                 if tu is not None and tv is not None:
-                    tu.successors.append(tv)
-                    tv.predecessors.append(tu)
-
-        # 3) Attach ordinates from token -> ("ord", value) edges
-        for u, v, ed in G.edges(data=True):
-            if ed.get("label") == "has_ordinate":
-                tok = tokens_by_name.get(u)
-                if tok is not None:
-                    # v should be ("ord", value)
-                    if isinstance(v, tuple) and len(v) == 2 and v[0] == "ord":
-                        tok.ordinate = float(v[1])
+                    tu.successors.add(tv)
+                    tv.predecessors.add(tu)
 
         # 4) Construct the Lexicon. Its __init__ will auto-register (track flag here).
         #    Pass tokens as an iterable; Lexicon will build its internal graph.
@@ -310,43 +625,527 @@ class Lexicon(MemoryStructure):
         sub = G.subgraph(nodes).copy()
         return cls.from_nx(sub, track=track)
 
-class List(MemoryStructure):
+class _Codebook:
+    """Value <-> integer code table for one attribute; code 0 is `None`."""
+    __slots__ = ("values", "codes", "truthy")
+
+    def __init__(self):
+        self.values: list = [None]
+        self.codes: dict = {}
+        self.truthy: list = [False]
+
+    def encode(self, value) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.truthy.append(bool(value))
+        return code
+
+    def lookup(self, value) -> int:
+        """Code of `value`, or -1 if it was never stored."""
+        if value is None:
+            return 0
+        return self.codes.get(value, -1)
+
+class _Columns:
+    """
+    Append-only column store shared by a CompactLexicon and its copies and
+    sub-lexicons. Rows are never rewritten, only appended.
+    """
+    __slots__ = ("names", "row_of", "books", "codes", "edges", "size")
+
+    def __init__(self):
+        self.names: list = []
+        self.row_of: Dict[str, int] = {}
+        self.books = {attribute: _Codebook() for attribute in Lexicon.INDEXED}
+        self.codes = {attribute: np.zeros(0, dtype=np.int32) for attribute in Lexicon.INDEXED}
+        self.edges = np.zeros(0, dtype=np.int8)
+        self.size = 0
+
+    def copy(self) -> "_Columns":
+        new = _Columns.__new__(_Columns)
+        new.names = list(self.names)
+        new.row_of = dict(self.row_of)
+        new.books = {}
+        for attribute, book in self.books.items():
+            b = _Codebook()
+            b.values, b.codes, b.truthy = list(book.values), dict(book.codes), list(book.truthy)
+            new.books[attribute] = b
+        new.codes = {attribute: col.copy() for attribute, col in self.codes.items()}
+        new.edges = self.edges.copy()
+        new.size = self.size
+        return new
+
+    def append(self, names, columns) -> np.ndarray:
+        """Append rows; `columns` maps attribute -> per-row values."""
+        start, k = self.size, len(names)
+        need = start + k
+        if need > len(self.edges):
+            cap = max(need, 2 * len(self.edges), 16)
+            for attribute, col in self.codes.items():
+                grown = np.zeros(cap, dtype=np.int32)
+                grown[:start] = col[:start]
+                self.codes[attribute] = grown
+            grown = np.zeros(cap, dtype=np.int8)
+            grown[:start] = self.edges[:start]
+            self.edges = grown
+        edges = np.zeros(k, dtype=np.int8)
+        for attribute in Lexicon.INDEXED:
+            values = columns.get(attribute)
+            book = self.books[attribute]
+            if values is None:
+                continue
+            codes = np.fromiter((book.encode(v) for v in values), dtype=np.int32, count=k)
+            self.codes[attribute][start:need] = codes
+            edges += np.asarray(book.truthy, dtype=np.int8)[codes]
+        self.edges[start:need] = edges
+        for i, name in enumerate(names, start):
+            self.row_of[name] = i
+        self.names.extend(names)
+        self.size = need
+        return np.arange(start, need, dtype=np.int32)
+
+class _CompactTokens:
+    """Read-only, indexable view of the live tokens of a CompactLexicon."""
+    __slots__ = ("_lex",)
+
+    def __init__(self, lex):
+        self._lex = lex
+
+    def __len__(self):
+        return self._lex._n
+
+    def __bool__(self):
+        return self._lex._n > 0
+
+    def __getitem__(self, i):
+        n = self._lex._n
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self._lex._token(int(self._lex._order[i]))
+
+    def __iter__(self):
+        lex = self._lex
+        for row in lex._order[:lex._n].tolist():
+            yield lex._token(row)
+
+    def __contains__(self, token):
+        return self._lex._row(token) is not None
+
+class CompactLexicon(MemoryStructure):
+    """
+    Columnar Lexicon backend for very large lexicons.
+    Attributes are integer codes in NumPy columns shared between a lexicon,
+    its copies and the sub-lexicons taken from it; each lexicon only owns a
+    live mask plus a dense order array with swap-remove, so `sample` stays
+    O(1) and `select`/`drop` are vectorized mask operations. Tokens are
+    materialized (untracked) only when asked for. Linked tokens are not
+    supported.
+    """
+    __slots__ = ("_cols", "_mask", "_order", "_pos", "_n", "_counts", "_n_edges", "_n_ordinals",
+                 "linked", "ordered")
+
+    INDEXED = Lexicon.INDEXED
+
+    def __init__(self, tokens = None, *, ordered = False, **kwargs):
+        self._cols = _Columns()
+        self.linked = False
+        self.ordered = ordered
+        self._reset()
+        for t in tokens or ():
+            self._insert(t)
+        super().__init__(**kwargs)
+
+    @classmethod
+    def from_columns(cls, names, attribute1 = None, attribute2 = None, ordinate = None,
+                     *, ordered = False, **kwargs) -> "CompactLexicon":
+        """Build straight from per-token value columns, without Token objects."""
+        names = list(names)
+        lex = cls.__new__(cls)
+        lex._cols = _Columns()
+        lex.linked = False
+        lex.ordered = ordered
+        lex._reset()
+        if ordinate is not None:
+            ordinate = [float(v) if v is not None else None for v in ordinate]
+        rows = lex._cols.append(names, {
+            "attribute1": attribute1, "attribute2": attribute2, "ordinate": ordinate,
+        })
+        if len(lex._cols.row_of) != len(names):
+            raise ValueError("CompactLexicon.from_columns got duplicate token names")
+        lex._enable(rows)
+        MemoryStructure.__init__(lex, **kwargs)
+        return lex
+
+    def _reset(self):
+        self._mask = np.zeros(0, dtype=bool)
+        self._order = np.zeros(0, dtype=np.int32)
+        self._pos = np.zeros(0, dtype=np.int32)
+        self._n = 0
+        self._counts = {attribute: np.zeros(0, dtype=np.int64) for attribute in self.INDEXED}
+        self._n_edges = 0
+        self._n_ordinals = 0
+
+    def _fit(self):
+        """Grow the per-lexicon arrays to cover every row and code."""
+        size = self._cols.size
+        if len(self._mask) < size:
+            cap = max(size, 2 * len(self._mask))
+            mask = np.zeros(cap, dtype=bool)
+            mask[:len(self._mask)] = self._mask
+            order = np.zeros(cap, dtype=np.int32)
+            order[:self._n] = self._order[:self._n]
+            pos = np.full(cap, -1, dtype=np.int32)
+            pos[:len(self._pos)] = self._pos
+            self._mask, self._order, self._pos = mask, order, pos
+        for attribute, counts in self._counts.items():
+            k = len(self._cols.books[attribute].values)
+            if len(counts) < k:
+                grown = np.zeros(max(k, 2 * len(counts)), dtype=np.int64)
+                grown[:len(counts)] = counts
+                self._counts[attribute] = grown
+
+    def _token(self, row: int) -> Token:
+        cols = self._cols
+        return Token(
+            name=cols.names[row],
+            attribute1=cols.books["attribute1"].values[cols.codes["attribute1"][row]],
+            attribute2=cols.books["attribute2"].values[cols.codes["attribute2"][row]],
+            ordinate=cols.books["ordinate"].values[cols.codes["ordinate"][row]],
+            track=False,
+        )
+
+    def _matches(self, row: int, token) -> bool:
+        cols = self._cols
+        return all(
+            cols.codes[attribute][row] == cols.books[attribute].lookup(getattr(token, attribute))
+            for attribute in self.INDEXED
+        )
+
+    def _row(self, token) -> Optional[int]:
+        """Live row holding `token`, if any."""
+        if not isinstance(token, Token) or token.linked:
+            return None
+        row = self._cols.row_of.get(token.name)
+        if row is None or row >= len(self._mask) or not self._mask[row]:
+            return None
+        return row if self._matches(row, token) else None
+
+    def _ordinal_delta(self, code: int, before: int, after: int):
+        if self._cols.books["ordinate"].truthy[code] and (before == 0) != (after == 0):
+            self._n_ordinals += 1 if after else -1
+
+    def _insert(self, token) -> bool:
+        """Make `token` live; False if it already was."""
+        if token.linked:
+            raise ValueError("CompactLexicon does not support linked tokens")
+        cols = self._cols
+        row = cols.row_of.get(token.name)
+        if row is not None and not self._matches(row, token):
+            if row < len(self._mask) and self._mask[row]:
+                raise ValueError(
+                    f"Lexicon already holds a different token named {token.name!r}: "
+                    f"{self._token(row)!r} vs {token!r}"
+                )
+            # repointing a shared name would break sibling lexicons
+            self._cols = cols = cols.copy()
+            row = None
+        if row is None:
+            row = int(cols.append([token.name], {
+                attribute: [getattr(token, attribute)] for attribute in self.INDEXED
+            })[0])
+        self._fit()
+        if self._mask[row]:
+            return False
+        self._mask[row] = True
+        self._pos[row] = self._n
+        self._order[self._n] = row
+        self._n += 1
+        for attribute, counts in self._counts.items():
+            code = cols.codes[attribute][row]
+            counts[code] += 1
+            if attribute == "ordinate":
+                self._ordinal_delta(code, counts[code] - 1, counts[code])
+        self._n_edges += int(cols.edges[row])
+        return True
+
+    def _enable(self, rows: np.ndarray):
+        """Vectorized insert of rows known to be dead."""
+        self._fit()
+        cols, k = self._cols, len(rows)
+        self._mask[rows] = True
+        self._order[self._n:self._n + k] = rows
+        self._pos[rows] = np.arange(self._n, self._n + k, dtype=np.int32)
+        self._n += k
+        for attribute in self.INDEXED:
+            counts = self._counts[attribute]
+            np.add.at(counts, cols.codes[attribute][rows], 1)
+        self._n_edges += int(cols.edges[rows].sum())
+        self._recount_ordinals()
+
+    def _recount_ordinals(self):
+        counts = self._counts["ordinate"]
+        truthy = np.asarray(self._cols.books["ordinate"].truthy, dtype=bool)
+        self._n_ordinals = int(np.count_nonzero(counts[:len(truthy)][truthy]))
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def __bool__(self):
+        return self._n > 0
+
+    @property
+    def tokens(self) -> _CompactTokens:
+        return _CompactTokens(self)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Live row ids, in sampling order."""
+        return self._order[:self._n].copy()
+
+    def compute_weight(self) -> float:
+        chain = max(self._n_ordinals - 1, 0) if self.ordered else 0
+        return float(self._n + self._n_edges + chain)
+
+    def add_token(self, new_token):
+        if self._insert(new_token):
+            self._changed()
+
+    def remove_token(self, drop_token):
+        row = self._row(drop_token)
+        if row is None:
+            return
+        i = int(self._pos[row])
+        last = int(self._order[self._n - 1])
+        self._order[i] = last
+        self._pos[last] = i
+        self._pos[row] = -1
+        self._mask[row] = False
+        self._n -= 1
+        cols = self._cols
+        for attribute, counts in self._counts.items():
+            code = cols.codes[attribute][row]
+            counts[code] -= 1
+            if attribute == "ordinate":
+                self._ordinal_delta(code, counts[code] + 1, counts[code])
+        self._n_edges -= int(cols.edges[row])
+        self._changed()
+
+    def drop(self, rows: np.ndarray) -> int:
+        """Vectorized removal of `rows`; returns how many were live."""
+        rows = np.asarray(rows, dtype=np.int32)
+        rows = rows[rows < len(self._mask)]
+        rows = np.unique(rows[self._mask[rows]])
+        if not len(rows):
+            return 0
+        cols = self._cols
+        self._mask[rows] = False
+        for attribute in self.INDEXED:
+            np.subtract.at(self._counts[attribute], cols.codes[attribute][rows], 1)
+        self._n_edges -= int(cols.edges[rows].sum())
+        self._recount_ordinals()
+        keep = self._order[:self._n]
+        keep = keep[self._mask[keep]]
+        self._pos[rows] = -1
+        self._order[:len(keep)] = keep
+        self._pos[keep] = np.arange(len(keep), dtype=np.int32)
+        self._n = len(keep)
+        self._changed()
+        return len(rows)
+
+    def discard_lexicon(self, other) -> int:
+        """Remove every token of `other`, vectorized when columns are shared."""
+        if isinstance(other, CompactLexicon) and other._cols is self._cols:
+            return self.drop(other.rows)
+        n = 0
+        for t in list(other.tokens):
+            if t in self.tokens:
+                self.remove_token(t)
+                n += 1
+        return n
+
+    def select(self, attribute, value, *, negative = False) -> np.ndarray:
+        """
+        Live rows whose `attribute` equals `value` (or, with negative=True,
+        carries any other truthy value). attribute=None matches `value`
+        under any indexed attribute.
+        """
+        live = self._order[:self._n]
+        if attribute is None:
+            keep = np.zeros(len(live), dtype=bool)
+            for a in self.INDEXED:
+                keep |= np.isin(live, self.select(a, value))
+            return live[keep]
+        if attribute not in self._cols.codes:
+            return live[:0].copy()
+        book = self._cols.books[attribute]
+        codes = self._cols.codes[attribute][live]
+        target = book.lookup(value)
+        if negative:
+            keep = (codes != target) & np.asarray(book.truthy, dtype=bool)[codes]
+        else:
+            keep = codes == target
+        return live[keep]
+
+    def take(self, rows, *, track: bool = True) -> "CompactLexicon":
+        """A new lexicon over the same columns holding only `rows`."""
+        new = CompactLexicon.__new__(CompactLexicon)
+        new._cols = self._cols
+        new.linked = False
+        new.ordered = self.ordered
+        new._reset()
+        new._enable(np.asarray(rows, dtype=np.int32))
+        MemoryStructure.__init__(new, track=track)
+        return new
+
+    def copy(self, *, track: bool = True) -> "CompactLexicon":
+        """Fresh mutable lexicon sharing the (append-only) columns."""
+        new = CompactLexicon.__new__(CompactLexicon)
+        new._cols = self._cols
+        new.linked = False
+        new.ordered = self.ordered
+        new._mask = self._mask.copy()
+        new._order = self._order.copy()
+        new._pos = self._pos.copy()
+        new._n = self._n
+        new._counts = {attribute: c.copy() for attribute, c in self._counts.items()}
+        new._n_edges = self._n_edges
+        new._n_ordinals = self._n_ordinals
+        MemoryStructure.__init__(new, track=track)
+        return new
+
+    def lookup(self, attribute, value) -> List[Token]:
+        return [self._token(r) for r in self.select(attribute, value).tolist()]
+
+    def lookup_other(self, attribute, value) -> List[Token]:
+        return [self._token(r) for r in self.select(attribute, value, negative=True).tolist()]
+
+    def values(self, attribute):
+        book = self._cols.books[attribute]
+        counts = self._counts[attribute]
+        return [book.values[c] for c in np.flatnonzero(counts[:len(book.values)]).tolist()
+                if book.truthy[c]]
+
+    def get_token(self, token):
+        row = self._cols.row_of.get(token)
+        if row is None or row >= len(self._mask) or not self._mask[row]:
+            return None
+        return self._token(row)
+
+    def subset(self, names, *, track: bool = True) -> "CompactLexicon":
+        row_of, mask = self._cols.row_of, self._mask
+        rows = [row_of[n] for n in names if n in row_of and row_of[n] < len(mask) and mask[row_of[n]]]
+        return self.take(np.unique(np.asarray(rows, dtype=np.int32)), track=track)
+
+    def successors(self, token: Token) -> List[Token]:
+        return []
+
+    def predecessors(self, token: Token) -> List[Token]:
+        return []
+
+    @property
+    def G(self) -> nx.DiGraph:
+        """Materialize the equivalent Lexicon graph (O(n); for inspection only)."""
+        G = nx.MultiDiGraph()
+        for t in self.tokens:
+            Lexicon._token_vet(self, t, G)
+        if self.ordered:
+            ordinates = sorted(n for n, data in G.nodes(data=True) if data.get("type") == "ordinate")
+            for u, v in zip(ordinates, ordinates[1:]):
+                G.add_edge(u, v)
+        return G
+
+def _copy_registers(value) -> bool:
+    """Whether deep-copying `value` could register anything in Space."""
+    if isinstance(value, Token):
+        return value._track or bool(value.predecessors or value.successors)
+    return not isinstance(value, (str, int, float, type(None)))
+
+class _CopyOnWrite:
+    """
+    clone() for item containers. The default clone shares `other`'s items
+    until either side changes them. Sharing is only done when a deep copy
+    would register nothing in Space (no tracked or linked items, counted
+    as they come and go in `_deep`), so the model's cost is unchanged;
+    otherwise the clone deep-copies. Mutators call _own() first.
+    """
+    __slots__ = ()
+
+    def _own(self):
+        if self._shared:
+            self.items = deque(self.items)
+            self._shared = False
+
+    def _count(self, value, sign: int = 1):
+        if _copy_registers(value):
+            self._deep += sign
+
+    def clone(self, other, *, deep: bool = False):
+        if isinstance(other, _CopyOnWrite):
+            deep = deep or bool(other._deep)
+        else:
+            deep = deep or any(map(_copy_registers, other.items))
+        if deep:
+            self.items = deque(deepcopy(list(other.items)))
+            self._shared = False
+            self._deep = sum(map(_copy_registers, self.items))
+        else:
+            self.items = other.items
+            self._shared = True
+            self._deep = 0
+            if isinstance(other, _CopyOnWrite):
+                other._shared = True
+        self._changed()
+
+class List(_CopyOnWrite, MemoryStructure):
     """Memory object representing a list; weight = list length."""
-    __slots__ = ("items",)
+    __slots__ = ("items", "_shared", "_deep")
 
     def __init__(self, items=None, **kwargs):
         self.items = deque(items) if items is not None else []
+        self._shared = False
+        self._deep = sum(map(_copy_registers, self.items))
         super().__init__(**kwargs)
 
     def compute_weight(self) -> float:
         return int(len(self.items))
 
     def suffix(self, value):
+        self._own()
         self.items.append(value)
+        self._count(value)
         self._changed()
 
     def prefix(self, values):
+        self._own()
         self.items.appendleft(values)
+        self._count(values)
         self._changed()
 
     def clear(self):
+        self._own()
         self.items.clear()
+        self._deep = 0
         self._changed()
 
     def reverse(self):
         self.items = deque(reversed(self.items))
-        self._changed()
-    
-    def clone(self, other):
-        self.items = deque(deepcopy(list(other.items)))
+        self._shared = False
         self._changed()
 
-class Queue(MemoryStructure):
+class Queue(_CopyOnWrite, MemoryStructure):
     """Memory object representing a queue; weight = queue length."""
-    __slots__ = ("items",)
+    __slots__ = ("items", "_shared", "_deep")
 
     def __init__(self, items=None, **kwargs):
         self.items = deque(items) if items is not None else deque()
+        self._shared = False
+        self._deep = sum(map(_copy_registers, self.items))
         super().__init__(**kwargs)
 
     def compute_weight(self) -> float:
@@ -356,20 +1155,22 @@ class Queue(MemoryStructure):
         return bool(self.items)
 
     def push_in(self, value):
+        self._own()
         self.items.appendleft(value)
+        self._count(value)
         self._changed()
 
     def push_out(self):
+        self._own()
         out = self.items.pop()
+        self._count(out, -1)
         self._changed()
         return out
 
     def clear(self):
+        self._own()
         self.items.clear()
-        self._changed()
-    
-    def clone(self, other):
-        self.items = deque(deepcopy(list(other.items)))
+        self._deep = 0
         self._changed()
 
 class Mode(MemoryStructure):
@@ -382,18 +1183,52 @@ class Mode(MemoryStructure):
         return 1
 
 
+def decode_tokens(ids) -> list:
+    """Tokens for an array of token ids, built once per distinct id and shared."""
+    unique, inverse = np.unique(np.asarray(ids, dtype=np.int64), return_inverse=True)
+    built = [Token.from_id(int(tid)) for tid in unique]
+    return [built[i] for i in inverse]
+
 class Sequence:
-    """The final sequence, not tracked in Space"""
-    __slots__ = ("items",)
+    """
+    The final sequence, not tracked in Space.
+    An encoded sequence keeps only token ids, in an array('I') that `ids`
+    exposes through the buffer protocol; `tids()` views it as a NumPy array
+    without copying and `tokens()` (or `items`) decodes it in one batch.
+    It holds the interned keys of its ids, so they decode for as long as the
+    sequence lives. Sequences are encoded when asked (encoded=True) or when
+    created inside a scope with encode_sequences=True.
+    """
+    __slots__ = ("_items", "ids", "_pins")
 
-    def __init__(self, items=None):
-        self.items = deque(items) if items is not None else []
+    def __init__(self, items=None, encoded=None):
+        if encoded is None:
+            scope = _CURRENT_RUN.get()
+            encoded = scope is not None and scope.encode_sequences
+        if encoded:
+            items = list(items or ())
+            self._items = None
+            self.ids = array('I', (t.tid for t in items))
+            self._pins = {t._interned for t in items}
+        else:
+            self._items = deque(items) if items is not None else []
+            self.ids = self._pins = None
+
+    @property
+    def items(self):
+        """The tokens; decoded afresh on every access when encoded."""
+        return decode_tokens(self.ids) if self.ids is not None else self._items
+
+    def __len__(self):
+        return len(self.ids) if self.ids is not None else len(self._items)
 
     def __repr__(self):
-        if not self.items:
+        if self.ids is not None:
+            return f"Sequence(<{len(self.ids)} encoded tokens>)"
+        if not self._items:
             return "Sequence([])"
         parts = []
-        for t in self.items:
+        for t in self._items:
             # assume these are mem.Token objects
             parts.append(
                 f"Token(name={t.name!r}, attr1={t.attribute1!r}, "
@@ -404,7 +1239,23 @@ class Sequence:
         return "Sequence([" + ", ".join(parts) + "])"
 
     def click(self, value):
-        self.items.append(value)
+        if self.ids is not None:
+            self.ids.append(value.tid)
+            self._pins.add(value._interned)
+        else:
+            self._items.append(value)
+
+    def tids(self) -> np.ndarray:
+        """
+        Token ids as uint32: a view of the buffer when encoded (the array
+        cannot grow while a view is alive), else a copy.
+        """
+        if self.ids is not None:
+            return np.frombuffer(self.ids, dtype=np.uint32)
+        return np.fromiter((t.tid for t in self._items), dtype=np.uint32, count=len(self._items))
+
+    def tokens(self) -> list:
+        return list(self.items)
 
 class Pointer(MemoryStructure):
     """The final sequence, not tracked in Space"""
@@ -3,26 +3,49 @@ from functools import wraps
 from contextvars import ContextVar
 import inspect
 from typing import Any, Callable, Dict, Optional, Tuple
-import random
 import model.memory as mem
 from copy import deepcopy
-from model.complexity import _CURRENT_RUN
+from model.complexity import _CURRENT_RUN, register_primitive, DEFAULT_RNG
 
-SEED = 42
-random.seed(SEED)
+def _lexicon_size(args, kwargs) -> int:
+    for a in (*args, *kwargs.values()):
+        if isinstance(a, (mem.Lexicon, mem.CompactLexicon)):
+            return len(a.tokens)
+    return -1
 
 def primitive_function(pf):
+    register_primitive(pf.__name__)
     @wraps(pf)
     def pf_ize(*args, **kwargs):
-        value, weight = pf(*args, **kwargs)
         scope = _CURRENT_RUN.get()
-        if scope is not None:
-            scope.kolmo.record(pf.__name__, weight)
+        if scope is None or scope.kolmo.calls is None:
+            value, weight = pf(*args, **kwargs)
+            if scope is not None:
+                scope.kolmo.record(pf.__name__, weight)
+            return value
+        kolmo = scope.kolmo
+        row = kolmo.enter(pf.__name__, _lexicon_size(args, kwargs))
+        weight = None
+        try:
+            value, weight = pf(*args, **kwargs)
+        finally:
+            kolmo.exit(row, pf.__name__, weight)
         return value
     return pf_ize
 
+def _rng():
+    """The active run's random stream, or the module default outside a run."""
+    scope = _CURRENT_RUN.get()
+    return scope.rng if scope is not None else DEFAULT_RNG
+
+def _charge(pf_name: str, weight, times: int = 1):
+    """Book `times` calls of a primitive whose work was done in bulk."""
+    scope = _CURRENT_RUN.get()
+    if scope is not None and times:
+        scope.kolmo.record(pf_name, weight, times)
+
 @primitive_function
-def add(L: mem.Lexicon | mem.Queue | mem.Sequence | mem.List, token):
+def add(L: mem.Lexicon | mem.CompactLexicon | mem.Queue | mem.Sequence | mem.List, token):
     """adds a token to a list, or pushes it into a queue"""
     if isinstance(L, mem.List):
         L.suffix(token)
@@ -30,7 +53,7 @@ def add(L: mem.Lexicon | mem.Queue | mem.Sequence | mem.List, token):
         L.click(token)
     if isinstance(L, mem.Queue):
         L.push_in(token)
-    if isinstance(L, mem.Lexicon):
+    if isinstance(L, (mem.Lexicon, mem.CompactLexicon)):
         L.add_token(token)
     weight = 1
     return None, weight
@@ -39,7 +62,7 @@ def add(L: mem.Lexicon | mem.Queue | mem.Sequence | mem.List, token):
 def flip(p = 0.5):
     """Returns true with probability p"""
     weight = 1
-    outcome = random.random() < p
+    outcome = _rng().random() < p
     return outcome, weight
 
 @primitive_function
@@ -50,18 +73,20 @@ def pick(a, b, p = 0.5):
     return choice, weight
 
 @primitive_function
-def sample(lexicon: mem.Lexicon):
+def sample(lexicon: mem.Lexicon | mem.CompactLexicon):
     """Sample from a lexicon."""
-    collection = list(lexicon.tokens)
-    spit = random.choice(collection)
+    spit = _rng().choice(lexicon.tokens)
     weight = 0 if len(lexicon.tokens)==1 else 1
     return spit, weight
 
 @primitive_function
-def remove(lexicon: mem.Lexicon, T: mem.Token | mem.Lexicon):
+def remove(lexicon: mem.Lexicon | mem.CompactLexicon, T: mem.Token | mem.Lexicon | mem.CompactLexicon):
     """Removes token from a lexicon"""
     weight = 0
-    if isinstance(T, mem.Lexicon):
+    if isinstance(T, mem.CompactLexicon) and isinstance(lexicon, mem.CompactLexicon):
+        lexicon.discard_lexicon(T)
+        weight += len(T.tokens)
+    elif isinstance(T, (mem.Lexicon, mem.CompactLexicon)):
         for t in T.tokens:
             lexicon.remove_token(t)
             weight += 1
@@ -83,7 +108,7 @@ def inquire_token(token: mem.Token, bias, lexicon: mem.Lexicon | None = None):
     return value, weight
 
 @primitive_function
-def find(lexicon: mem.Lexicon, token = None, criterion = None, *, negative = False, move = False):      
+def find(lexicon: mem.Lexicon | mem.CompactLexicon, token = None, criterion = None, *, negative = False, move = False):      
     if lexicon.linked == True:
         if criterion == 'in':
             pass
@@ -94,21 +119,29 @@ def find(lexicon: mem.Lexicon, token = None, criterion = None, *, negative = Fal
             type_needed = inquire_token(token, criterion)
         else:
             type_needed = criterion
-        found_elements = []
+    if isinstance(lexicon, mem.CompactLexicon):
+        attribute = criterion if (token or negative) else None
+        rows = lexicon.select(attribute, type_needed, negative=negative)
+        sub_lex = lexicon.take(rows)
+        _charge("add", 1, len(rows))
+        if move:
+            remove(lexicon, sub_lex)
+        return sub_lex, (1 if negative else 0)
     if negative:
-        for u, v in lexicon.G.edges():
-            if lexicon.G.nodes[v].get("type") == criterion and v != type_needed and lexicon.G.nodes[u].get("type") == 'token':
-                found_elements.append(u)
+        found_elements = lexicon.lookup_other(criterion, type_needed)
         weight = 1
+    elif token:
+        found_elements = list(lexicon.lookup(criterion, type_needed))
+        weight = 0
     else:
-        for u, v in lexicon.G.edges():
-            if v == type_needed and lexicon.G.nodes[u].get("type") == 'token':
-                found_elements.append(u)
+        # a bare criterion names a value, whichever attribute carries it
+        found_elements = list(dict.fromkeys(
+            t for attribute in lexicon.INDEXED for t in lexicon.lookup(attribute, type_needed)
+        ))
         weight = 0
     sub_lex = mem.Lexicon()
-    for token in lexicon.tokens:
-        if token.name in found_elements:
-            add(sub_lex, token)
+    for token in found_elements:
+        add(sub_lex, token)
     if move:
         remove(lexicon, sub_lex)
     return sub_lex, weight
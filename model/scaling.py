@@ -0,0 +1,151 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from model.lexicons import LexiconSpec
+from model.sweep import Job, _function_ref, run_job
+
+# two-sided 95% Student t quantiles for 1..30 degrees of freedom
+_T95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+MODELS = ("power", "nlogn")
+
+@dataclass
+class ScalingFit:
+    """
+    y ~ a * n**exponent ("power") or y ~ a * n * log n ("nlogn"), fitted in
+    log space. `ci` is the 95% interval on the exponent (fixed at 1 for
+    nlogn) and `residual` the mean squared log residual per degree of
+    freedom, so the two models can be compared directly. The nlogn fit
+    leaves out points with n <= 1, where log log n is undefined.
+    """
+    model: str
+    exponent: float
+    ci: Tuple[float, float]
+    coefficient: float
+    residual: float
+
+def fit_scaling(n, y, model: str = "power") -> ScalingFit:
+    """Least-squares fit of one scaling model to positive (n, y) points."""
+    if model not in MODELS:
+        raise ValueError(f"unknown model {model!r}; expected one of {MODELS}")
+    n, y = np.asarray(n, dtype=float), np.asarray(y, dtype=float)
+    if model == "nlogn":
+        n, y = n[n > 1], y[n > 1]
+    if len(n) < 3:
+        raise ValueError(f"need at least three points to fit a scaling model, got {len(n)}"
+                         + (" with n > 1" if model == "nlogn" else ""))
+    x, target = np.log(n), np.log(y)
+    if model == "nlogn":
+        offsets = target - x - np.log(np.log(n))
+        intercept = offsets.mean()
+        resid = offsets - intercept
+        dof = len(n) - 1
+        return ScalingFit(model, 1.0, (1.0, 1.0), float(np.exp(intercept)),
+                          float(resid @ resid) / dof)
+    slope, intercept = np.polyfit(x, target, 1)
+    resid = target - (intercept + slope * x)
+    dof = len(n) - 2
+    sse = float(resid @ resid)
+    se = np.sqrt(sse / dof / ((x - x.mean()) @ (x - x.mean())))
+    t = _T95[dof - 1] if dof <= len(_T95) else 1.96
+    return ScalingFit(
+        model=model,
+        exponent=float(slope),
+        ci=(float(slope - t * se), float(slope + t * se)),
+        coefficient=float(np.exp(intercept)),
+        residual=sse / dof,
+    )
+
+@dataclass
+class ScalingReport:
+    function: str
+    sizes: List[int] = field(default_factory=list)
+    reps: List[int] = field(default_factory=list)
+    mdl: List[float] = field(default_factory=list)        # mean over reps
+    mdl_sem: List[float] = field(default_factory=list)
+    space: List[float] = field(default_factory=list)      # mean peak space
+    failures: List[int] = field(default_factory=list)
+    fits: Dict[str, Dict[str, ScalingFit]] = field(default_factory=dict)
+    converged: bool = False
+
+    def best(self, metric: str = "mdl") -> ScalingFit:
+        """The model with the smaller residual for `metric` ("mdl" or "space")."""
+        return min(self.fits[metric].values(), key=lambda f: f.residual)
+
+def ladder(start: int, stop: int, ratio: float = 2.0, multiple: int = 1) -> List[int]:
+    """Geometric sizes from `start` to at most `stop`, rounded to `multiple`."""
+    sizes, n = [], float(start)
+    while n <= stop:
+        size = max(multiple, int(round(n / multiple)) * multiple)
+        if not sizes or size > sizes[-1]:
+            sizes.append(size)
+        n *= ratio
+    return sizes
+
+def measure_scaling(fn: Callable | str, *, spec: Callable[[int], LexiconSpec] = None,
+                    start: int = 4, stop: int = 512, ratio: float = 2.0, multiple: int = 2,
+                    min_reps: int = 3, max_reps: int = 30, rel_err: float = 0.02,
+                    window: int = 5, tol: float = 0.02, patience: int = 2,
+                    min_sizes: int = 4, seed: int = 0) -> ScalingReport:
+    """
+    Run a @cognitive_function up a geometric ladder of lexicon sizes and fit
+    power-law and n log n models to its mean mdl and peak space.
+
+    At each size, seeds are added until the mean mdl's standard error is
+    within `rel_err` of the mean (deterministic functions stop at
+    `min_reps`). Fits use the top `window` sizes. The ladder stops once the
+    local log-log slope of mdl has moved by less than `tol` for `patience`
+    steps in a row; a single flat step is not enough, since lower-order
+    terms can bend the curve both ways at small n.
+    `spec(n)` lays out the lexicon (default LexiconSpec(n, 2)); failed runs
+    are counted and left out of the means.
+    """
+    ref = _function_ref(fn)
+    spec = spec or (lambda n: LexiconSpec(n, 2))
+    report = ScalingReport(ref)
+    stable = 0
+    for n in ladder(start, stop, ratio, multiple):
+        layout = spec(n)
+        mdl, space, failed = [], [], 0
+        rep = 0
+        while rep < max_reps:
+            result = run_job(Job(rep, ref, layout, seed + rep))
+            rep += 1
+            if result.error is not None:
+                failed += 1
+            else:
+                mdl.append(result.mdl)
+                space.append(result.space_complexity)
+            if len(mdl) >= min_reps:
+                sem = np.std(mdl, ddof=1) / np.sqrt(len(mdl))
+                if sem <= rel_err * np.mean(mdl):
+                    break
+        if not mdl:
+            report.failures.append(failed)
+            break
+        report.sizes.append(n)
+        report.reps.append(rep)
+        report.mdl.append(float(np.mean(mdl)))
+        report.mdl_sem.append(float(np.std(mdl, ddof=1) / np.sqrt(len(mdl))) if len(mdl) > 1 else 0.0)
+        report.space.append(float(np.mean(space)))
+        report.failures.append(failed)
+        if len(report.sizes) < min_sizes:
+            continue
+        sizes = report.sizes[-window:]
+        report.fits = {
+            metric: {model: fit_scaling(sizes, values[-window:], model) for model in MODELS}
+            for metric, values in (("mdl", report.mdl), ("space", report.space))
+        }
+        slopes = np.diff(np.log(report.mdl[-3:])) / np.diff(np.log(report.sizes[-3:]))
+        stable = stable + 1 if abs(slopes[1] - slopes[0]) < tol else 0
+        if stable >= patience:
+            report.converged = True
+            break
+    return report
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import importlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from model.cache import _sequence_keys
+from model.complexity import RunScope, RunSnapshot, _CURRENT_RUN
+from model.lexicons import LexiconSpec
+
+@dataclass(frozen=True)
+class Job:
+    """One (cognitive function, lexicon spec, seed) cell of a sweep."""
+    index: int
+    function: str        # "module:qualname"
+    spec: LexiconSpec
+    seed: int
+
+@dataclass
+class JobResult:
+    job: Job
+    mdl: float = float("nan")
+    space_complexity: float = float("nan")
+    counts: Dict[str, int] = field(default_factory=dict)
+    sequence: Optional[Tuple[str, ...]] = None
+    error: Optional[str] = None
+
+def _function_ref(fn: Callable | str) -> str:
+    if isinstance(fn, str):
+        return fn if ":" in fn else f"model.cognitive_functions:{fn}"
+    return f"{fn.__module__}:{fn.__qualname__}"
+
+def _resolve(ref: str) -> Callable:
+    module, qualname = ref.split(":")
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return getattr(obj, "__wrapped__", obj)
+
+def make_jobs(functions: Iterable[Callable | str], specs: Iterable[LexiconSpec],
+              seeds: Iterable[int]) -> List[Job]:
+    """The full function x spec x seed grid, in a fixed order."""
+    specs, seeds = list(specs), list(seeds)
+    jobs = []
+    for fn in functions:
+        ref = _function_ref(fn)
+        for spec in specs:
+            for seed in seeds:
+                jobs.append(Job(len(jobs), ref, spec, seed))
+    return jobs
+
+def run_job(job: Job, *, keep_sequence: bool = False, cache=None) -> JobResult:
+    """
+    Run one job in this process; failures are reported, not raised.
+    With a ResultCache, stored results are returned without running and new
+    ones are stored.
+    """
+    run = _resolve(job.function)
+    lexicon = job.spec.build()
+    key = None
+    if cache is not None:
+        key = cache.key(run, lexicon, job.seed)
+        hit = cache.get(key)
+        if hit is not None:
+            snap = hit.snapshot
+            return JobResult(
+                job,
+                mdl=snap.mdl,
+                space_complexity=snap.space_complexity,
+                counts=dict(snap.k_complexity_breakdown),
+                sequence=tuple(k[0] for k in hit.sequence) if keep_sequence else None,
+            )
+    scope = RunScope(job.seed, peak_only=True, encode_sequences=True)
+    token = _CURRENT_RUN.set(scope)
+    try:
+        scope.space.register(lexicon, lexicon.compute_weight())
+        result = run(lexicon)
+    except Exception as e:
+        return JobResult(job, error=f"{type(e).__name__}: {e}")
+    finally:
+        _CURRENT_RUN.reset(token)
+        scope.release()
+    mdl, space = scope.kolmo.total, scope.space.max_seen
+    keys = _sequence_keys(result) if keep_sequence or cache is not None else None
+    if cache is not None:
+        cache.put(key, RunSnapshot(mdl, dict(scope.kolmo.counts), space), keys)
+    sequence = tuple(k[0] for k in keys) if keep_sequence else None
+    return JobResult(
+        job,
+        mdl=mdl,
+        space_complexity=space,
+        counts=dict(scope.kolmo.counts),
+        sequence=sequence,
+    )
+
+def _run_chunk(jobs: List[Job], keep_sequence: bool, cache=None) -> List[JobResult]:
+    return [run_job(job, keep_sequence=keep_sequence, cache=cache) for job in jobs]
+
+def sweep(jobs: List[Job], *, workers: Optional[int] = None, chunksize: int = 8,
+          keep_sequence: bool = False, cache=None) -> Iterator[JobResult]:
+    """
+    Run `jobs` across a process pool, yielding results as chunks finish.
+    Every job is seeded from its own `seed` alone, so the set of results is
+    identical for any worker count; sort by `result.job.index` for a stable
+    order. workers=0 runs in-process. Pass a ResultCache to skip jobs that
+    have already been run; workers open their own connections to it.
+    """
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    if workers == 0:
+        for chunk in chunks:
+            yield from _run_chunk(chunk, keep_sequence, cache)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, keep_sequence, cache) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def run_sweep(functions: Iterable[Callable | str], specs: Iterable[LexiconSpec],
+              seeds: Iterable[int], **kwargs) -> List[JobResult]:
+    """Convenience wrapper: build the grid, sweep it, return results in job order."""
+    results = list(sweep(make_jobs(functions, specs, seeds), **kwargs))
+    results.sort(key=lambda r: r.job.index)
+    return results
@@ -0,0 +1,65 @@
+import pytest
+import model.cognitive_functions as cf
+import model.cache as cache_mod
+from model.cache import ResultCache
+from model.lexicons import LexiconSpec
+from model.sweep import run_sweep
+
+def test_cache_hit_skips_execution(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "runs.db")
+    lex = LexiconSpec(8, 2).build(track=False)
+    first = cache.run(cf.iterate, lex, seed=3)
+    seq, comp = cf.iterate(lex.copy(), seed=3)
+    assert first.snapshot.mdl == comp.last.mdl
+    assert [t.name for t in first.tokens()] == [t.name for t in seq.items]
+
+    calls = []
+    def fake(*args, **kwargs):
+        calls.append(1)
+        return cf.iterate(*args, **kwargs)
+    fake.__wrapped__ = cf.iterate.__wrapped__
+    again = cache.run(fake, lex, seed=3)
+    assert not calls
+    assert again == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(ValueError):
+        cache.key(cf.iterate, lex, None)
+
+def test_cache_key_covers_function_lexicon_seed_and_sources(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "runs.db")
+    lex = LexiconSpec(8, 2).build(track=False)
+    base = cache.key(cf.iterate, lex, 0)
+    assert base == cache.key(cf.iterate, lex.copy(), 0)
+    assert base != cache.key(cf.iterate, LexiconSpec(8, 2, backend="compact").build(track=False), 0)
+    assert base != cache.key(cf.iterate, lex, 1)
+    assert base != cache.key(cf.seriate, lex, 0)
+    assert base != cache.key(cf.iterate, LexiconSpec(8, 4).build(track=False), 0)
+    fresh = ResultCache(tmp_path / "runs.db")
+    monkeypatch.setattr(cache_mod, "SOURCES", ("model.cognitive_functions",))
+    assert fresh.key(cf.iterate, lex, 0) != base
+
+def test_cache_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "runs.db", max_entries=2)
+    lex = LexiconSpec(6, 2).build(track=False)
+    keys = [cache.key(cf.iterate, lex, s) for s in range(3)]
+    for s in range(2):
+        cache.run(cf.iterate, lex, seed=s)
+    assert cache.get(keys[0]) is not None
+    cache.run(cf.iterate, lex, seed=2)
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+
+    sized = ResultCache(tmp_path / "sized.db", max_bytes=1)
+    sized.run(cf.iterate, lex, seed=0)
+    assert len(sized) == 0
+
+def test_sweep_with_shared_cache(tmp_path):
+    cache = ResultCache(tmp_path / "runs.db")
+    args = (["iterate", "seriate"], [LexiconSpec(8, 2)], range(3))
+    cold = run_sweep(*args, workers=2, chunksize=2, keep_sequence=True, cache=cache)
+    assert len(cache) == 6
+    warm = run_sweep(*args, workers=0, keep_sequence=True, cache=cache)
+    assert cache.hits == 6
+    assert [(r.mdl, r.space_complexity, r.counts, r.sequence) for r in cold] == \
+           [(r.mdl, r.space_complexity, r.counts, r.sequence) for r in warm]
@@ -1,7 +1,7 @@
 import pytest
 import model.memory as mem
 import model.primitive_fucntions as pf
-from model.complexity import Space, Kolmo, RunScope, RunSnapshot, Complexity, cognitive_function
+from model.complexity import Space, Kolmo, RunScope, RunSnapshot, Complexity, cognitive_function, _CURRENT_RUN
 
 def test_space_register_update_purge():
     s = Space()
@@ -271,3 +271,250 @@ def test_cognitive_function_with_sample_and_push_out():
     assert isinstance(result[0], mem.Token)
     assert result[1] == 2
     assert isinstance(comp, Complexity)
+
+def test_run_batch_struct_of_arrays():
+    import numpy as np
+    import model.cognitive_functions as cf
+    from model.complexity import run_batch, BatchResult
+    template = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 3}") for i in range(9)])
+    batch = run_batch(cf.iterate, template, 4, seed=0, keep_sequences=True)
+    assert isinstance(batch, BatchResult)
+    assert batch.mdl.shape == (4,) and batch.space_complexity.shape == (4,)
+    assert batch.counts.shape == (4, len(batch.primitives))
+    assert (batch.count("sample") == 9).all()
+    assert all(len(seq) == 9 for seq in batch.sequences)
+    assert len(template.tokens) == 9
+    seq, comp = cf.iterate(template.copy(), seed=np.random.SeedSequence(0).spawn(4)[0])
+    assert batch.mdl[0] == comp.last.mdl
+    assert batch.space_complexity[0] == comp.last.space_complexity
+    assert list(batch.sequences[0]) == [t.tid for t in seq.items]
+    assert batch.sequences[0].dtype == np.uint32
+    encoded, comp2 = cf.iterate(template.copy(), seed=np.random.SeedSequence(0).spawn(4)[0],
+                                encode_sequences=True)
+    assert encoded.ids is not None and encoded.items == encoded.tokens() == list(seq.items)
+    assert comp2.last.mdl == comp.last.mdl
+
+def test_lexicon_copy_is_independent():
+    template = mem.Lexicon(tokens=[mem.Token(name="A", attribute1="x"), mem.Token(name="B", attribute1="x")])
+    clone = template.copy()
+    clone.remove_token(mem.Token(name="A", attribute1="x"))
+    assert len(template.tokens) == 2 and len(clone.tokens) == 1
+    assert len(template.lookup("attribute1", "x")) == 2
+    assert template.G.number_of_nodes() == 3
+
+def test_run_rng_streams_are_reproducible_and_split():
+    from model.complexity import RunRNG
+    a, b = RunRNG(5), RunRNG(5)
+    assert [a.random() for _ in range(5)] == [b.random() for _ in range(5)]
+    c1, c2 = RunRNG(5).spawn(2)
+    assert c1.random() != c2.random()
+    blocked = RunRNG(5, block=4)
+    draws = [blocked.randbelow(10) for _ in range(10)]
+    assert all(0 <= d < 10 for d in draws)
+    again = RunRNG(5, block=4)
+    assert draws == [again.randbelow(10) for _ in range(10)]
+    with pytest.raises(IndexError):
+        a.choice([])
+
+def test_concurrent_seeded_runs_are_deterministic():
+    from concurrent.futures import ThreadPoolExecutor
+    import model.cognitive_functions as cf
+
+    def run(seed):
+        lex = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 4}") for i in range(40)])
+        seq, comp = cf.seriate(lex, seed=seed)
+        return [t.name for t in seq.items], comp.last.mdl
+
+    expected = [run(s) for s in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(run, range(8))) == expected
+    assert len({tuple(names) for names, _ in expected}) > 1
+
+def test_space_modes_agree():
+    import random
+    from model.complexity import LocalSpace, PeakSpace
+    rng = random.Random(1)
+    objs = [mem.List(items=[i]) for i in range(6)]
+    spaces = [Space(), LocalSpace(), PeakSpace()]
+    for _ in range(200):
+        obj, op, w = rng.choice(objs), rng.choice(["register", "update", "purge"]), rng.randint(0, 9)
+        for s in spaces:
+            if op == "purge":
+                s.purge(obj)
+            else:
+                getattr(s, op)(obj, float(w))
+        assert len({(s.total, s.max_seen) for s in spaces}) == 1
+    assert spaces[2].active is None
+
+def test_runscope_space_selection():
+    from model.complexity import LocalSpace, PeakSpace
+    assert type(RunScope().space) is LocalSpace
+    assert type(RunScope(shared=True).space) is Space
+    assert type(RunScope(peak_only=True).space) is PeakSpace
+
+def test_arena_scope_purges_dead_and_releases_live_structures():
+    import weakref
+    c = Complexity()
+    before = len(weakref.finalize._registry)
+    a = mem.Token(name="A", attribute1="x")
+    with c.activate():
+        scope = _CURRENT_RUN.get()
+        q = mem.Queue(items=[1, 2])
+        lex = mem.Lexicon(tokens=[a])
+        assert scope.space.total == 2 + 2
+        pf.add(q, 3)
+        assert scope.space.total == 3 + 2
+        q.purge()
+        assert scope.space.total == 2
+        temp = mem.Queue(items=[1])
+        assert scope.space.total == 3
+        del temp
+        assert scope.space.total == 2
+    assert len(weakref.finalize._registry) == before
+    assert not scope.open and scope.space.total == 0.0
+    del lex
+    assert scope.space.total == 0.0
+    assert c.last.space_complexity == 5
+
+def test_finalizer_scope_purges_from_its_own_scope():
+    import gc
+    outer = RunScope(arena=False)
+    token = _CURRENT_RUN.set(outer)
+    try:
+        q = mem.Queue(items=[1, 2, 3])
+        assert outer.space.total == 3
+    finally:
+        _CURRENT_RUN.reset(token)
+    inner = RunScope()
+    token = _CURRENT_RUN.set(inner)
+    try:
+        del q
+        gc.collect()
+    finally:
+        _CURRENT_RUN.reset(token)
+    assert outer.space.total == 0
+    with pytest.raises(ValueError):
+        RunScope(peak_only=True, arena=False)
+
+def test_memory_flat_across_many_runs():
+    import weakref
+    import model.cognitive_functions as cf
+    from model.complexity import run_batch
+    template = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 2}") for i in range(4)])
+    before = len(weakref.finalize._registry)
+    run_batch(cf.iterate, template, 500, seed=1)
+    for s in range(100):
+        cf.iterate(template.copy(), seed=s)
+    assert len(weakref.finalize._registry) == before
+
+def test_space_trace_records_timeline_and_peak_attribution(tmp_path):
+    import numpy as np
+    import model.cognitive_functions as cf
+    lex = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 3}") for i in range(9)])
+    seq, comp = cf.seriate(lex, seed=3, space_trace=4096)
+    snap = comp.last
+    trace = snap.space_trace
+    rows = trace.rows()
+    assert len(rows) == trace.written > 0
+    assert rows["total"].max() == snap.space_complexity
+    assert (np.diff(rows["step"]) >= 0).all()
+    assert sum(snap.peak_breakdown.values()) == pytest.approx(snap.space_complexity)
+    assert {"Lexicon", "Queue"} <= set(snap.peak_breakdown)
+    trace.to_npz(tmp_path / "trace.npz")
+    saved = np.load(tmp_path / "trace.npz")
+    assert (saved["total"] == rows["total"]).all()
+    frame = trace.to_frame()
+    assert list(frame.columns) == ["step", "total", "delta", "structure"]
+    _, plain = cf.seriate(mem.Lexicon(tokens=[mem.Token(name="A", attribute1="x")]), seed=3)
+    assert plain.last.space_trace is None and plain.last.peak_breakdown == {}
+
+def test_space_trace_books_finalizer_purges():
+    import model.cognitive_functions as cf
+    from model.lexicons import LexiconSpec
+    comp = Complexity()
+    with comp.activate(3, arena=False, space_trace=4096):
+        scope = _CURRENT_RUN.get()
+        lex = LexiconSpec(8, 2).build()
+        cf.seriate.__wrapped__(lex)
+        trace = scope.space
+        assert trace.rows()["delta"].min() < 0
+        assert sum(trace.by_type.values()) == pytest.approx(trace.total)
+
+def test_arena_and_finalizer_scopes_report_the_same_space():
+    import model.cognitive_functions as cf
+    from model.lexicons import LexiconSpec
+    cells = [("iterate", LexiconSpec(8, 2)), ("seriate", LexiconSpec(8, 2)), ("alternate", LexiconSpec(9, 3)),
+             ("palindrome", LexiconSpec(8, 4)), ("serial_crossed", LexiconSpec(8, 2, 2)),
+             ("center_embedded", LexiconSpec(8, 2, 2)), ("tail_recursive", LexiconSpec(6, 1, 2))]
+    for name, spec in cells:
+        for seed in range(3):
+            peaks = []
+            for arena in (True, False):
+                comp = Complexity()
+                with comp.activate(seed, arena=arena):
+                    getattr(cf, name).__wrapped__(spec.build())
+                peaks.append((comp.last.mdl, comp.last.space_complexity))
+            _, decorated = getattr(cf, name)(spec.build(), seed=seed)
+            assert peaks[0] == peaks[1] == (decorated.last.mdl, decorated.last.space_complexity), (name, seed)
+    _, comp = cf.seriate(LexiconSpec(8, 2).build(), seed=3)
+    assert comp.last.space_complexity == 21.0
+
+def test_space_trace_ring_buffer_keeps_latest_rows():
+    from model.complexity import SpaceTrace, LocalSpace
+    trace = SpaceTrace(LocalSpace(), Kolmo(), capacity=4)
+    q = mem.Queue(track=False)
+    for w in range(1, 8):
+        trace.update(q, float(w))
+    assert trace.written == 7
+    assert list(trace.rows()["total"]) == [4.0, 5.0, 6.0, 7.0]
+    assert trace.peak_by_type == {"Queue": 7.0}
+
+def test_call_trace_matches_kolmo_and_grows():
+    import numpy as np
+    import model.cognitive_functions as cf
+    from model.complexity import PRIMITIVES
+    lex = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 3}") for i in range(9)])
+    _, comp = cf.seriate(lex, seed=3, call_trace=2)
+    snap = comp.last
+    rows = snap.call_trace.rows()
+    names = list(PRIMITIVES)
+    assert len(rows) == sum(snap.k_complexity_breakdown.values())
+    assert rows["weight"].sum() == pytest.approx(snap.mdl)
+    for name, count in snap.k_complexity_breakdown.items():
+        assert (rows["pid"] == names.index(name)).sum() == count
+    assert rows["size"].max() == 9
+    assert {0, 1} <= set(rows["depth"])
+    # pre-order: every call comes after the call it runs inside
+    nested = rows["parent"] >= 0
+    assert ((rows["parent"] == -1) == (rows["depth"] == 0)).all()
+    assert (rows["parent"][nested] < np.flatnonzero(nested)).all()
+    assert (rows["depth"][nested] == rows["depth"][rows["parent"][nested]] + 1).all()
+
+def test_run_batch_sequences_outlive_their_lexicon():
+    import gc
+    import model.cognitive_functions as cf
+    from model.complexity import run_batch
+    template = mem.Lexicon(tokens=[mem.Token(name=f"once{i}", attribute1=f"c{i % 2}") for i in range(4)])
+    batch = run_batch(cf.iterate, template, 2, seed=1, keep_sequences=True)
+    del template
+    gc.collect()
+    assert sorted(t.name for t in mem.decode_tokens(batch.sequences[0])) == [f"once{i}" for i in range(4)]
+
+def test_run_batch_call_traces_export(tmp_path):
+    import numpy as np
+    import model.cognitive_functions as cf
+    import pandas as pd
+    from model.complexity import PRIMITIVES, CallTrace, run_batch, export_call_traces
+    template = mem.Lexicon(tokens=[mem.Token(name=f"t{i}", attribute1=f"c{i % 2}") for i in range(4)])
+    batch = run_batch(cf.iterate, template, 3, seed=1, call_trace=16)
+    assert [len(t) for t in batch.call_traces] == list(batch.counts.sum(axis=1))
+    export_call_traces(batch.call_traces, tmp_path / "calls.npz")
+    saved = np.load(tmp_path / "calls.npz")
+    assert list(np.bincount(saved["run"])) == [len(t) for t in batch.call_traces]
+    assert saved["weight"].sum() == pytest.approx(batch.mdl.sum())
+    export_call_traces(batch.call_traces, tmp_path / "calls.csv")
+    frame = pd.read_csv(tmp_path / "calls.csv")
+    for name in ("run", *CallTrace.DTYPE.names):
+        assert (frame[name].to_numpy() == saved[name]).all()
+    assert list(frame["primitive"]) == [list(PRIMITIVES)[p] for p in saved["pid"]]
+    assert run_batch(cf.iterate, template, 1, seed=1).call_traces is None
@@ -0,0 +1,36 @@
+import pytest
+import networkx as nx
+from model.cache import lexicon_signature
+from model.lexicons import LexiconSpec, LexiconTemplate, compile_spec, make_lexicon
+
+def test_template_stamps_match_fresh_builds():
+    for spec in (LexiconSpec(12, 3), LexiconSpec(12, 4, 2), LexiconSpec(12, 4, 2, "compact")):
+        template = spec.template()
+        assert isinstance(template, LexiconTemplate) and template is compile_spec(spec)
+        a, b = template.stamp_many(2, track=False)
+        fresh = spec.construct(track=False)
+        assert lexicon_signature(a) == lexicon_signature(fresh)
+        assert a.compute_weight() == fresh.compute_weight()
+        a.remove_token(a.tokens[0])
+        assert len(b.tokens) == len(template.stamp().tokens) == 12
+        if spec.backend == "graph":
+            assert nx.utils.graphs_equal(b.G, fresh.G)
+            assert b.G.number_of_nodes() != a.G.number_of_nodes()
+
+def test_balanced_layout_unchanged():
+    names, attribute1, attribute2 = LexiconSpec(12, 3, 2).columns()
+    assert attribute1 == [f"a{i % 3}" for i in range(12)]
+    assert attribute2 == [f"b{i // 3}" for i in range(12)]
+
+def test_skewed_layout():
+    spec = LexiconSpec(40, 5, 2, skew=1.0)
+    sizes = spec.group_sizes()
+    assert sum(sizes) == 40 and sizes == sorted(sizes, reverse=True) and min(sizes) >= 1
+    lex = make_lexicon(40, 5, 2, skew=1.0, track=False)
+    assert [len(lex.lookup("attribute1", f"a{g}")) for g in range(5)] == sizes
+    assert len(lex.lookup("attribute2", "b0")) == 5
+    assert LexiconSpec(7, 3, skew=0.5).group_sizes() == [3, 2, 2]
+    with pytest.raises(ValueError):
+        LexiconSpec(2, 3, skew=1.0)
+    with pytest.raises(ValueError):
+        LexiconSpec(6, 3, skew=-1.0)
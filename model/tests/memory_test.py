@@ -1,8 +1,10 @@
 import pytest
 from model.memory import (
-    MemoryStructure, Token, Lexicon, List, Queue, Mode, Sequence, Pointer
+    MemoryStructure, Token, Lexicon, List, Queue, Mode, Sequence, Pointer,
+    decode_tokens, _copy_graph
 )
 import networkx as nx
+import model.memory as memory
 
 def test_memorystructure_compute_weight_default():
     m = MemoryStructure()
@@ -85,6 +87,46 @@ def test_sequence_click_and_init():
     s.click(2)
     assert list(s.items) == [1,2]
 
+def test_encoded_sequence_round_trip():
+    import numpy as np
+    a, b = Token(name="A", attribute1="x"), Token(name="B", attribute1="y", ordinate=2)
+    s = Sequence(encoded=True)
+    for t in (a, b, a):
+        s.click(t)
+    assert len(s) == 3 and s.items == [a, b, a]
+    assert repr(s) == "Sequence(<3 encoded tokens>)"
+    view = s.tids()
+    assert view.dtype == np.uint32 and np.shares_memory(view, np.frombuffer(s.ids, dtype=np.uint32))
+    assert list(view) == [a.tid, b.tid, a.tid]
+    del view
+    decoded = s.tokens()
+    assert decoded == [a, b, a] and decoded[0] is decoded[2]
+    assert decoded[1].ordinate == 2.0 and not decoded[1]._track
+    # decoding only looks ids up, it never interns new keys
+    linked = Token(name="C", attribute1="x", predecessors=[a])
+    before = len(memory._TOKEN_KEYS)
+    decoded = decode_tokens([linked.tid])
+    assert decoded[0].linked and len(memory._TOKEN_KEYS) == before
+    assert decode_tokens([]) == []
+    assert Sequence([a, b], encoded=True).tokens() == Sequence([a, b]).tokens()
+
+def test_token_ids_are_forgotten_with_their_last_holder():
+    import gc
+    key = ("short-lived", "x", None, None, False)
+    s = Sequence(encoded=True)
+    s.click(Token(name="short-lived", attribute1="x"))
+    gc.collect()
+    # the sequence alone keeps its id decodable
+    tid = s.ids[0]
+    assert key in memory._TOKEN_IDS and s.tokens()[0].name == "short-lived"
+    del s
+    gc.collect()
+    assert key not in memory._TOKEN_IDS
+    with pytest.raises(KeyError, match="no longer interned"):
+        memory.token_key(tid)
+    # interning the key again hands out a new id rather than reusing the old one
+    assert Token(name="short-lived", attribute1="x").tid != tid
+
 def test_pointer_init_and_node():
     p = Pointer(node="N")
     assert p.node == "N"
@@ -100,6 +142,64 @@ def test_queue_clone():
     q2.clone(q1)
     assert list(q2.items) == [1,2]
 
+def test_clone_is_copy_on_write():
+    from model.complexity import RunScope, _CURRENT_RUN
+    a, b = Token(name="A", attribute1="x", track=False), Token(name="B", attribute1="y", track=False)
+    q1 = Queue(items=[a, b], track=False)
+    q2 = Queue(track=False)
+    q2.clone(q1)
+    assert q2.items is q1.items
+    q2.push_in(a)
+    q1.push_out()
+    assert list(q1.items) == [a] and list(q2.items) == [a, a, b]
+    l = List(items=[a])
+    l.clone(q2, deep=True)
+    assert l.items[1] == a and l.items[1] is not a
+    # a tracked item would register its copy, so such clones copy right away
+    q1.push_in(Token(name="C", attribute1="x"))
+    q2.clone(q1)
+    assert q2.items is not q1.items and q2.items[0] is not q1.items[0]
+    q1.push_out(), q1.push_out()
+    q2.clone(q1)
+    assert q2.items is q1.items
+
+    totals = []
+    for deep in (True, False):
+        scope = RunScope()
+        token = _CURRENT_RUN.set(scope)
+        try:
+            src = Queue(items=[Token(name="A", attribute1="x"), Token(name="B", attribute1="y", track=False)])
+            dst = Queue()
+            dst.clone(src, deep=deep)
+            src.push_out()
+            totals.append((scope.space.total, scope.space.max_seen))
+            src.push_out()
+            dst.clone(src, deep=deep)
+            totals.append((scope.space.total, scope.space.max_seen))
+        finally:
+            _CURRENT_RUN.reset(token)
+    assert totals[:2] == totals[2:]
+
+@pytest.mark.parametrize("algorithm, dims, layouts", [
+    ("palindrome", 1, [(4, 2), (8, 4), (6, 3)]),
+    ("center_embedded", 2, [(4, 2), (6, 2), (3, 1)]),
+])
+def test_copy_on_write_clone_matches_deepcopy_space(monkeypatch, algorithm, dims, layouts):
+    import model.cognitive_functions as cf
+    import model.memory as mem
+    from model.lexicons import LexiconSpec
+    def run():
+        runs = []
+        for n, divs in layouts:
+            for seed in range(3):
+                _, comp = getattr(cf, algorithm)(LexiconSpec(n, divs, dims).build(), seed=seed)
+                runs.append((comp.last.mdl, comp.last.space_complexity))
+        return runs
+    shared = run()
+    clone = mem._CopyOnWrite.clone
+    monkeypatch.setattr(mem._CopyOnWrite, "clone", lambda self, other, deep=False: clone(self, other, deep=True))
+    assert run() == shared
+
 def test_list_prefix_and_suffix():
     l = List(items=[1])
     l.prefix(0)
@@ -130,3 +230,187 @@ def test_pointer_init_and_node():
     p = Pointer(node="N")
     assert p.node == "N"
 
+
+def _graph_state(G):
+    from collections import Counter
+    nodes = {n: dict(data) for n, data in G.nodes(data=True)}
+    edges = Counter((u, v, tuple(sorted(data.items()))) for u, v, data in G.edges(data=True))
+    return nodes, edges
+
+@pytest.mark.parametrize("ordered", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_lexicon_incremental_graph_matches_rebuild(ordered, seed):
+    import random
+    rng = random.Random(seed)
+    colours, shapes = ["red", "blue", "green"], ["circle", "square", None]
+    pool = []
+    for i in range(12):
+        links = rng.sample(pool, k=min(len(pool), rng.choice([0, 0, 1, 2])))
+        pool.append(Token(
+            name=f"t{i}",
+            attribute1=rng.choice(colours),
+            attribute2=rng.choice(shapes),
+            ordinate=rng.choice([None, 1, 2, 3, 4]),
+            predecessors=links,
+        ))
+    lex = Lexicon(tokens=rng.sample(pool, 4), ordered=ordered)
+    for _ in range(60):
+        t = rng.choice(pool)
+        if t in lex.tokens:
+            lex.remove_token(t)
+        else:
+            lex.add_token(t)
+        assert _graph_state(lex.G) == _graph_state(lex._build_graph())
+        assert lex.compute_weight() == len(lex.tokens) + lex.G.number_of_edges()
+
+def test_lexicon_attribute_index_tracks_mutations():
+    t1 = Token(name="A", attribute1="red", attribute2="circle")
+    t2 = Token(name="B", attribute1="red", attribute2="square")
+    t3 = Token(name="C", attribute1="blue", ordinate=1)
+    lex = Lexicon(tokens=[t1, t2, t3])
+    assert set(lex.lookup("attribute1", "red")) == {t1, t2}
+    assert set(lex.lookup_other("attribute1", "red")) == {t3}
+    assert set(lex.lookup("ordinate", 1.0)) == {t3}
+    lex.remove_token(t1)
+    assert set(lex.lookup("attribute1", "red")) == {t2}
+    assert list(lex.lookup("attribute2", "circle")) == []
+    assert "circle" not in lex.values("attribute2")
+    lex.add_token(t1)
+    assert set(lex.values("attribute1")) == {"red", "blue"}
+
+def test_indexed_set_swap_remove():
+    from model.memory import IndexedSet
+    s = IndexedSet(["a", "b", "c", "d"])
+    assert len(s) == 4 and s[0] == "a"
+    s.remove("b")
+    assert list(s) == ["a", "d", "c"]
+    assert "b" not in s and s[1] == "d"
+    s.discard("zzz")
+    s.add("a")
+    assert len(s) == 3
+    with pytest.raises(KeyError):
+        s.remove("b")
+    assert s == {"a", "c", "d"}
+
+def test_seeded_runs_reproduce_across_hash_seeds():
+    import os, subprocess, sys
+    script = (
+        "import model.memory as mem, model.cognitive_functions as cf\n"
+        "lex = mem.Lexicon(tokens=[mem.Token(name=f't{i}', attribute1=f'c{i % 4}') for i in range(24)])\n"
+        "seq, _ = cf.iterate(lex, seed=7)\n"
+        "print(' '.join(t.name for t in seq.items))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    outputs = set()
+    for hash_seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed, PYTHONPATH=root)
+        out = subprocess.run([sys.executable, "-c", script], env=env, cwd=root,
+                             capture_output=True, text=True, check=True)
+        outputs.add(out.stdout)
+    assert len(outputs) == 1
+
+def test_token_hash_is_stable_and_matches_eq():
+    a = Token(name="A", attribute1="red")
+    b = Token(name="B", attribute1="red", predecessors=[a])
+    h = hash(b)
+    b.successors.add(Token(name="C"))
+    assert hash(b) == h
+    assert Token(name="A", attribute1="red") == a
+    assert hash(Token(name="A", attribute1="red")) == hash(a)
+    assert Token(name="A", attribute1="blue") != a
+    assert len({a, Token(name="A", attribute1="red")}) == 1
+
+def test_lexicon_from_nx_attaches_ordinates():
+    G = nx.MultiDiGraph()
+    G.add_node("A", type="token", attribute1="red")
+    G.add_node("B", type="token", attribute1="blue")
+    G.add_edge("A", ("ord", 2), label="has_ordinate")
+    G.add_edge("A", "B", label="token_edge")
+    lex = Lexicon.from_nx(G, track=False)
+    a = lex.get_token("A")
+    assert a.ordinate == 2.0
+    assert [t.name for t in a.successors] == ["B"]
+
+def test_lexicon_name_index():
+    a = Token(name="A", attribute1="red")
+    b = Token(name="B", attribute1="red", predecessors=[a])
+    lex = Lexicon(tokens=[a, b])
+    assert lex.get_token("B") is b
+    assert lex.successors(a) == [b]
+    assert lex.predecessors(b) == [a]
+    lex.remove_token(Token(name="A", attribute1="red"))
+    assert lex.get_token("A") is None
+    sub = lex.subset(["B", "Z"], track=False)
+    assert sub.get_token("B") is b and len(sub.tokens) == 1
+
+def test_lexicon_name_collision_raises():
+    lex = Lexicon(tokens=[Token(name="A", attribute1="red")])
+    with pytest.raises(ValueError, match="'A'"):
+        lex.add_token(Token(name="A", attribute1="blue"))
+    assert len(lex.tokens) == 1
+    with pytest.raises(ValueError):
+        Lexicon(tokens=[Token(name="B", attribute1="red"), Token(name="B")])
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_compact_lexicon_matches_lexicon(ordered):
+    import random
+    from model.memory import CompactLexicon
+    rng = random.Random(0)
+    pool = [
+        Token(name=f"t{i}", attribute1=rng.choice(["red", "blue"]),
+              attribute2=rng.choice(["circle", None]), ordinate=rng.choice([None, 1, 2, 3]))
+        for i in range(10)
+    ]
+    lex = Lexicon(tokens=pool[:5], ordered=ordered)
+    compact = CompactLexicon(tokens=pool[:5], ordered=ordered)
+    for _ in range(50):
+        t = rng.choice(pool)
+        if t in lex.tokens:
+            lex.remove_token(t)
+            compact.remove_token(t)
+        else:
+            lex.add_token(t)
+            compact.add_token(t)
+        assert set(compact.tokens) == set(lex.tokens)
+        assert compact.compute_weight() == lex.compute_weight()
+        assert set(compact.lookup("attribute1", "red")) == set(lex.lookup("attribute1", "red"))
+        assert set(compact.lookup_other("attribute1", "red")) == set(lex.lookup_other("attribute1", "red"))
+        assert set(compact.values("ordinate")) == set(lex.values("ordinate"))
+    assert _graph_state(compact.G) == _graph_state(lex.G)
+
+def test_compact_lexicon_columns_take_and_drop():
+    from model.memory import CompactLexicon
+    lex = CompactLexicon.from_columns(
+        [f"t{i}" for i in range(6)], attribute1=["red", "blue"] * 3, track=False
+    )
+    assert len(lex.tokens) == 6
+    assert lex.get_token("t1") == Token(name="t1", attribute1="blue")
+    reds = lex.take(lex.select("attribute1", "red"), track=False)
+    assert {t.name for t in reds.tokens} == {"t0", "t2", "t4"}
+    assert lex.discard_lexicon(reds) == 3
+    assert {t.name for t in lex.tokens} == {"t1", "t3", "t5"}
+    assert lex.compute_weight() == 6.0
+    clone = lex.copy(track=False)
+    clone.remove_token(Token(name="t1", attribute1="blue"))
+    assert len(lex.tokens) == 3 and len(clone.tokens) == 2
+    with pytest.raises(ValueError):
+        lex.add_token(Token(name="t3", attribute1="red"))
+    with pytest.raises(ValueError):
+        CompactLexicon.from_columns(["a", "a"])
+
+def test_copy_graph_matches_networkx_copy():
+    G = nx.MultiDiGraph(name="g")
+    G.add_node("a", kind="token")
+    G.add_edge("a", "x", key="attribute1", w=1)
+    G.add_edge("a", "x", key="extra")
+    G.add_edge("b", "a", key=0, w=2)
+    H, expected = _copy_graph(G), G.copy()
+    assert H.graph == expected.graph
+    assert list(H.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(H.edges(keys=True, data=True)) == list(expected.edges(keys=True, data=True))
+    assert list(H.in_edges(keys=True, data=True)) == list(expected.in_edges(keys=True, data=True))
+    # successor and predecessor maps share each edge's data, and nothing is shared with G
+    H["a"]["x"]["attribute1"]["w"] = 5
+    assert H.pred["x"]["a"]["attribute1"]["w"] == 5 and G["a"]["x"]["attribute1"]["w"] == 1
+    H.nodes["a"]["kind"] = "other"
+    assert G.nodes["a"]["kind"] == "token"
@@ -98,4 +98,42 @@ def test_inquire_token_link_and_attribute():
     assert val == "foo"
     # link inquiry (should return 'out' since no edges)
     val_link = pf.inquire_token(t1, "link", lexicon=lex)
-    assert val_link in {"in", "out"}
\ No newline at end of file
+    assert val_link in {"in", "out"}
+
+def test_find_negative_and_move():
+    t1 = mem.Token(name="A", attribute1="foo")
+    t2 = mem.Token(name="B", attribute1="bar")
+    t3 = mem.Token(name="C", attribute1="baz")
+    lex = mem.Lexicon(tokens={t1, t2, t3})
+    others = pf.find(lex, token=t1, criterion="attribute1", negative=True)
+    assert {t.name for t in others.tokens} == {"B", "C"}
+    moved = pf.find(lex, token=t1, criterion="attribute1", move=True)
+    assert {t.name for t in moved.tokens} == {"A"}
+    assert {t.name for t in lex.tokens} == {"B", "C"}
+
+def test_find_charges_same_weights():
+    from model.complexity import cognitive_function
+    tokens = [mem.Token(name=f"t{i}", attribute1=f"c{i % 3}") for i in range(9)]
+
+    @cognitive_function()
+    def run(lex):
+        pf.find(lex, token=tokens[0], criterion="attribute1")
+        pf.find(lex, token=tokens[0], criterion="attribute1", negative=True)
+
+    _, comp = run(mem.Lexicon(tokens=tokens))
+    counts = comp.last.k_complexity_breakdown
+    assert counts["find"] == 2
+    assert counts["inquire_token"] == 2
+    assert counts["add"] == 3 + 6
+    assert comp.last.mdl == 2 + 9 + 1
+
+def test_find_and_remove_on_compact_lexicon():
+    tokens = [mem.Token(name=f"t{i}", attribute1=f"c{i % 3}") for i in range(9)]
+    lex = mem.CompactLexicon(tokens=tokens)
+    found = pf.find(lex, token=tokens[0], criterion="attribute1", move=True)
+    assert isinstance(found, mem.CompactLexicon)
+    assert {t.name for t in found.tokens} == {"t0", "t3", "t6"}
+    assert len(lex.tokens) == 6
+    others = pf.find(lex, token=tokens[1], criterion="attribute1", negative=True)
+    assert {t.name for t in others.tokens} == {"t2", "t5", "t8"}
+    assert pf.sample(others) in others.tokens
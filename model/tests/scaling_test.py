@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from model.scaling import fit_scaling, ladder, measure_scaling
+
+def test_fit_scaling_recovers_exponent_and_model():
+    n = np.array([8, 16, 32, 64, 128])
+    power = fit_scaling(n, 3 * n ** 1.5)
+    assert power.exponent == pytest.approx(1.5)
+    assert power.coefficient == pytest.approx(3)
+    noisy = fit_scaling(n, 3 * n ** 1.5 * np.exp(np.random.default_rng(0).normal(0, 0.05, len(n))))
+    assert noisy.ci[0] < 1.5 < noisy.ci[1]
+    y = 2 * n * np.log(n)
+    assert fit_scaling(n, y, "nlogn").residual < fit_scaling(n, y, "power").residual
+    with pytest.raises(ValueError):
+        fit_scaling(n[:2], y[:2])
+    # n = 1 carries no n log n information and is left out
+    with_one = fit_scaling(np.r_[1, n], np.r_[5.0, y], "nlogn")
+    assert with_one.coefficient == pytest.approx(2) and with_one.residual == pytest.approx(0)
+    with pytest.raises(ValueError, match="n > 1"):
+        fit_scaling([1, 1, 2, 4], [1, 1, 2, 8], "nlogn")
+
+def test_ladder_is_geometric_and_rounded():
+    assert ladder(4, 100, 2.0, multiple=3) == [3, 9, 15, 33, 63]
+    assert ladder(4, 64) == [4, 8, 16, 32, 64]
+
+def test_measure_scaling_converges_on_linear_function():
+    report = measure_scaling("iterate", stop=1024)
+    assert report.converged and report.sizes[-1] < 1024
+    fit = report.best("mdl")
+    assert fit.model == "power" and 0.95 < fit.exponent < 1.1
+    assert report.reps[0] == 3
+
+def _always_fails(lexicon):
+    raise RuntimeError("stub")
+
+def test_measure_scaling_stops_when_every_run_fails():
+    report = measure_scaling(_always_fails, stop=64)
+    assert report.sizes == [] and report.fits == {}
+    assert report.failures == [30] and not report.converged
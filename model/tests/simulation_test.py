@@ -0,0 +1,86 @@
+import difflib
+import numpy as np
+from simulation import StringGenerator, lcs_batch, levenshtein_batch
+
+# (len_a, len_b) pairs: equal, mixed, and long enough for int32 DP tables
+SHAPES = ((1, 1), (4, 4), (3, 9), (9, 3), (130, 127), (126, 140))
+
+NOTEBOOK_CONFIGS = (
+    ([{'a', 'b', 'c', 'd'}, {'c', 'd', 'e', 'f'}, {'e', 'f', 'a', 'b'}], 4),
+    ([{'a', 'b', 'c', 'd', 'e', 'f'}], 6),
+    ([{'a', 'b', 'c', 'd'}], 3),
+)
+
+def _levenshtein(a, b):
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+def _pairs(rng, len_a, len_b, n=40, symbols=3):
+    return rng.integers(0, symbols, (n, len_a)), rng.integers(0, symbols, (n, len_b))
+
+def test_levenshtein_batch_matches_reference():
+    rng = np.random.default_rng(0)
+    for len_a, len_b in SHAPES:
+        a, b = _pairs(rng, len_a, len_b)
+        expected = [_levenshtein(list(x), list(y)) for x, y in zip(a, b)]
+        assert levenshtein_batch(a, b, chunk=16).tolist() == expected
+
+def test_lcs_batch_matches_difflib():
+    rng = np.random.default_rng(1)
+    for len_a, len_b in SHAPES:
+        a, b = _pairs(rng, len_a, len_b)
+        lengths, starts = lcs_batch(a, b, chunk=16, return_start=True)
+        assert (lcs_batch(a, b) == lengths).all()
+        for x, y, n, k in zip(a, b, lengths, starts):
+            match = difflib.SequenceMatcher(None, list(x), list(y), autojunk=False).find_longest_match(
+                0, len(x), 0, len(y))
+            assert (n, k) == (match.size, match.a)
+
+def _counts(values, size):
+    return np.bincount(values, minlength=size)
+
+def test_stream_matches_array_mode():
+    for symbol_sets, len_seq in NOTEBOOK_CONFIGS:
+        sg = StringGenerator(symbol_sets, len_seq=len_seq, workers=1)
+        arrays = sg.Simulator(sg, n_rounds=300, chunk=128)
+        stream = sg.Simulator(sg, n_rounds=300, chunk=128, stream=True)
+        size = len(stream.n_unique.counts)
+        assert size == sg.n_seq * len(symbol_sets) + 1
+        assert (stream.n_unique.counts == _counts(arrays.n_unique, size)).all()
+        assert (stream.levenshtein.counts == _counts(arrays.levenshtein, len_seq + 1)).all()
+        assert (stream.lcs_len.counts == _counts(arrays.lcs_len, len_seq + 1)).all()
+        assert np.isclose(stream.similarity.mean, arrays.similarity.mean())
+        # the default in-process path draws the same chunks
+        default = StringGenerator(symbol_sets, len_seq=len_seq)
+        assert (default.Simulator(default, n_rounds=300, chunk=128).levenshtein == arrays.levenshtein).all()
+        unseeded = StringGenerator(symbol_sets, len_seq=len_seq, seed=None)
+        assert unseeded.Simulator(unseeded, n_rounds=50, stream=True).n_unique.n == 50
+
+def test_chunks_identical_for_any_worker_count():
+    symbol_sets, len_seq = NOTEBOOK_CONFIGS[0]
+    runs = []
+    for workers in (1, 2):
+        sg = StringGenerator(symbol_sets, len_seq=len_seq, workers=workers, seed=7)
+        arrays = sg.Simulator(sg, n_rounds=200, chunk=64, keep_lcs=True)
+        stream = sg.Simulator(sg, n_rounds=200, chunk=64, stream=True)
+        runs.append((arrays, stream))
+    (a1, s1), (a2, s2) = runs
+    for name in ("levenshtein", "lcs", "lcs_len", "n_unique"):
+        assert (getattr(a1, name) == getattr(a2, name)).all()
+    for name in ("levenshtein", "lcs_len", "similarity", "n_unique"):
+        x, y = getattr(s1, name), getattr(s2, name)
+        assert (x.counts == y.counts).all() and x.mean == y.mean and x.m2 == y.m2
+
+def test_zero_rounds_give_empty_results():
+    symbol_sets, len_seq = NOTEBOOK_CONFIGS[0]
+    sg = StringGenerator(symbol_sets, len_seq=len_seq, workers=2)
+    arrays = sg.Simulator(sg, n_rounds=0, keep_lcs=True)
+    for name in ("levenshtein", "lcs", "lcs_len", "similarity", "n_unique"):
+        assert getattr(arrays, name).shape == (0,)
+    stream = sg.Simulator(sg, n_rounds=0, stream=True)
+    assert stream.levenshtein.n == stream.n_unique.n == 0
@@ -0,0 +1,45 @@
+import math
+import pytest
+import model.cognitive_functions as cf
+from model.lexicons import LexiconSpec
+from model.sweep import make_jobs, run_job, run_sweep
+
+def test_lexicon_spec_build():
+    lex = LexiconSpec(n=6, divs=3, dims=2).build(track=False)
+    assert len(lex.tokens) == 6
+    assert set(lex.values("attribute1")) == {"a0", "a1", "a2"}
+    assert set(lex.values("attribute2")) == {"b0", "b1"}
+    compact = LexiconSpec(n=6, divs=3, backend="compact").build(track=False)
+    assert compact.compute_weight() == LexiconSpec(n=6, divs=3).build(track=False).compute_weight()
+    with pytest.raises(ValueError):
+        LexiconSpec(n=7, divs=3)
+
+def test_make_jobs_grid():
+    jobs = make_jobs([cf.iterate, "seriate"], [LexiconSpec(6, 2), LexiconSpec(6, 3)], [0, 1])
+    assert len(jobs) == 8
+    assert [j.index for j in jobs] == list(range(8))
+    assert jobs[0].function == "model.cognitive_functions:iterate"
+    assert jobs[-1].function == "model.cognitive_functions:seriate"
+
+def test_run_job_reports_errors():
+    # groups of 3 run palindrome's basis dry on every seed
+    job = make_jobs(["palindrome"], [LexiconSpec(6, 2)], [0])[0]
+    result = run_job(job)
+    assert result.error is not None and result.error.startswith("IndexError")
+    assert math.isnan(result.mdl) and math.isnan(result.space_complexity)
+
+def test_sweep_identical_for_any_worker_count():
+    args = (["iterate", "alternate", "seriate"], [LexiconSpec(8, 2), LexiconSpec(9, 3)], range(3))
+    serial = run_sweep(*args, workers=0, keep_sequence=True)
+    pooled = run_sweep(*args, workers=2, chunksize=2, keep_sequence=True)
+    assert len(serial) == 18
+    for a, b in zip(serial, pooled):
+        assert a.job == b.job
+        assert (a.mdl, a.space_complexity, a.counts, a.sequence, a.error) == \
+               (b.mdl, b.space_complexity, b.counts, b.sequence, b.error)
+
+def test_run_job_matches_decorated_run():
+    job = make_jobs(["seriate"], [LexiconSpec(8, 2)], [5])[0]
+    result = run_job(job)
+    _, comp = cf.seriate(job.spec.build(), seed=5)
+    assert (result.mdl, result.space_complexity) == (comp.last.mdl, comp.last.space_complexity)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from model.lexicons import LexiconSpec
+from model.sweep import Job, run_job
+from theoretical import DIMS, calculate_theoretical_complexity, cross_check, predict, supported, unvalidated
+
+CELLS = {
+    "iterate": [(6, 2), (8, 4), (9, 3), (12, 2)],
+    "palindrome": [(4, 2), (6, 3), (8, 4)],
+    "alternate": [(1, 1), (4, 2), (8, 2)],
+    "seriate": [(6, 2), (8, 4), (9, 3)],
+    "serial_crossed": [(4, 2), (6, 2), (5, 1)],
+    "center_embedded": [(4, 2), (6, 2), (3, 1)],
+    "tail_recursive": [(4, 1), (6, 1), (4, 2)],
+}
+
+def test_predict_matches_runs():
+    for algorithm, cells in CELLS.items():
+        n, divs = np.array(cells).T
+        kolmo, space = predict(algorithm, n, divs)
+        for (cell_n, cell_d), k, s in zip(cells, kolmo, space):
+            spec = LexiconSpec(cell_n, cell_d, DIMS[algorithm])
+            for seed in range(3):
+                result = run_job(Job(0, f"model.cognitive_functions:{algorithm}", spec, seed))
+                assert result.error is None
+                assert (result.mdl, result.space_complexity) == (k, s), (algorithm, cell_n, cell_d)
+        assert calculate_theoretical_complexity(algorithm, *cells[0]) == (kolmo[0], space[0])
+
+def test_predict_marks_unsupported_cells():
+    kolmo, space = predict("palindrome", [6, 7, 8], [2, 2, 4])
+    # g = 3 runs palindrome's basis dry; 7 is not a multiple of 2
+    assert np.isnan(kolmo[:2]).all() and np.isnan(space[:2]).all()
+    assert not np.isnan(kolmo[2])
+    assert supported("alternate", [8, 9], [2, 3]).tolist() == [True, False]
+    assert supported("tail_recursive", [4, 6], [2, 2]).tolist() == [True, False]
+    with pytest.raises(ValueError, match="no model"):
+        calculate_theoretical_complexity("alternate", 9, 3)
+
+def test_cross_check_settles_deterministic_cells():
+    report = cross_check(["iterate", "serial_crossed"], n=range(2, 9), divs=range(1, 3),
+                         points=4, seeds=range(2))
+    assert len(report) == 8 and (report.runs == 2).all()
+    assert unvalidated(report).empty
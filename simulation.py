@@ -1,8 +1,7 @@
 import numpy as np
 import random
 import itertools
-import Levenshtein
-import difflib
+from concurrent.futures import ProcessPoolExecutor
 import seaborn as sns
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -12,34 +11,250 @@ warnings.filterwarnings('ignore')
 SEED = 42
 random.seed(SEED)
 
+def encode_sequences(strings, alphabet):
+    """Equal-length strings as an integer array, one row per string."""
+    codes = {symbol: i for i, symbol in enumerate(sorted(alphabet))}
+    dtype = np.uint8 if len(codes) <= 256 else np.int32
+    return np.array([[codes[c] for c in s] for s in strings], dtype=dtype).reshape(len(strings), -1)
+
+def levenshtein_batch(a, b, chunk=1 << 16):
+    """
+    Edit distances between the rows of two integer arrays, (pairs, len_a)
+    and (pairs, len_b). The DP table is laid out (position, pair) so that
+    every step is a contiguous vector operation across a chunk of pairs;
+    the only Python loops are over the string positions.
+    """
+    a = np.ascontiguousarray(np.asarray(a).T)
+    b = np.ascontiguousarray(np.asarray(b).T)
+    len_a, len_b = a.shape[0], b.shape[0]
+    dtype = np.int8 if max(len_a, len_b) < 127 else np.int32
+    out = np.empty(a.shape[1], dtype=np.int64)
+    for start in range(0, a.shape[1], chunk):
+        x, y = a[:, start:start + chunk], b[:, start:start + chunk]
+        prev = np.repeat(np.arange(len_b + 1, dtype=dtype)[:, None], x.shape[1], axis=1)
+        cur = np.empty_like(prev)
+        substitute = np.empty((len_b, x.shape[1]), dtype=dtype)
+        for i in range(len_a):
+            np.not_equal(x[i], y, out=substitute, casting='unsafe')
+            substitute += prev[:-1]
+            np.add(prev[1:], 1, out=cur[1:])
+            np.minimum(cur[1:], substitute, out=cur[1:])
+            cur[0] = i + 1
+            for j in range(1, len_b + 1):
+                np.minimum(cur[j], cur[j - 1] + 1, out=cur[j])
+            prev, cur = cur, prev
+        out[start:start + chunk] = prev[len_b]
+    return out
+
+def lcs_batch(a, b, chunk=1 << 16, return_start=False):
+    """
+    Longest common substring lengths between the rows of two integer
+    arrays, with the same (position, pair) layout as levenshtein_batch.
+    With return_start=True also returns where each match starts in `a`;
+    ties go to the earliest start in `a`, then in `b`, as difflib does.
+    """
+    a = np.ascontiguousarray(np.asarray(a).T)
+    b = np.ascontiguousarray(np.asarray(b).T)
+    len_a, len_b = a.shape[0], b.shape[0]
+    dtype = np.int8 if max(len_a, len_b) < 127 else np.int32
+    lengths = np.zeros(a.shape[1], dtype=np.int64)
+    starts = np.zeros(a.shape[1], dtype=np.int64)
+    for start in range(0, a.shape[1], chunk):
+        x, y = a[:, start:start + chunk], b[:, start:start + chunk]
+        prev = np.zeros((len_b + 1, x.shape[1]), dtype=dtype)
+        cur = np.zeros_like(prev)
+        best = np.zeros(x.shape[1], dtype=dtype)
+        best_end = np.zeros(x.shape[1], dtype=np.int64)
+        for i in range(len_a):
+            np.add(prev[:-1], 1, out=cur[1:])
+            cur[1:] *= x[i] == y
+            row_best = cur.max(axis=0)
+            if return_start:
+                better = row_best > best
+                best_end[better] = i
+            np.maximum(best, row_best, out=best)
+            prev, cur = cur, prev
+        lengths[start:start + chunk] = best
+        starts[start:start + chunk] = best_end - best + 1
+    if return_start:
+        return lengths, np.where(lengths > 0, starts, 0)
+    return lengths
+
+class Accumulator:
+    """
+    Fixed-memory running summary of an integer-valued metric: exact
+    bincounts over 0..size-1 plus count, mean and variance. The k-th bin
+    stands for the value offset + scale * k, so e.g. similarity can be
+    accumulated straight from Levenshtein distances. Accumulators built on
+    separate chunks merge exactly.
+    """
+
+    def __init__(self, size, offset=0.0, scale=1.0):
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.offset = offset
+        self.scale = scale
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @property
+    def values(self):
+        return self.offset + self.scale * np.arange(len(self.counts))
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def _combine(self, n, mean, m2):
+        # Chan et al. pairwise update of count, mean and sum of squares
+        total = self.n + n
+        if total == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def update(self, k):
+        k = np.asarray(k, dtype=np.int64)
+        if k.size == 0:
+            return
+        counts = np.bincount(k, minlength=len(self.counts))
+        if len(counts) > len(self.counts):
+            raise ValueError(f"value {k.max()} is outside the {len(self.counts)} bins")
+        self.counts += counts
+        values = self.offset + self.scale * k
+        self._combine(k.size, values.mean(), ((values - values.mean()) ** 2).sum())
+
+    def merge(self, other):
+        if len(other.counts) != len(self.counts) or (other.offset, other.scale) != (self.offset, self.scale):
+            raise ValueError("can only merge accumulators over the same bins")
+        self.counts += other.counts
+        self._combine(other.n, other.mean, other.m2)
+        return self
+
+def permutation_block(rng, parent, n_rounds):
+    """
+    Every sequence of `n_rounds` rounds as one (rounds, sequences, len_seq)
+    array of symbol codes (see encode_sequences), laid out like
+    Round.sequence_list. Each row draws len_seq symbols without replacement
+    from one symbol set, by argsorting a matrix of uniform keys.
+    """
+    alphabet = {symbol: i for i, symbol in enumerate(sorted(parent.symbols))}
+    block = np.empty((n_rounds, parent.n_seq, len(parent.symbol_sets), parent.len_seq), dtype=np.uint8
+                     if len(alphabet) <= 256 else np.int32)
+    for k, symbol_set in enumerate(parent.symbol_sets):
+        codes = np.array([alphabet[c] for c in sorted(symbol_set)])
+        order = np.argsort(rng.random((n_rounds, parent.n_seq, len(codes))), axis=-1)
+        block[:, :, k] = codes[order[..., :parent.len_seq]]
+    return block.reshape(n_rounds, parent.n_seq * len(parent.symbol_sets), parent.len_seq)
+
+def decode_sequences(parent, encoded):
+    """Strings back from an array of symbol codes, keeping its leading shape."""
+    alphabet = np.array(sorted(parent.symbols), dtype=object)
+    flat = encoded.reshape(-1, encoded.shape[-1])
+    strings = np.array(["".join(row) for row in alphabet[flat]], dtype=object)
+    return strings.reshape(encoded.shape[:-1])
+
+def count_unique(encoded):
+    """Number of distinct sequences in each round of a (rounds, sequences, len) block."""
+    n_rounds, per_round, len_seq = encoded.shape
+    rows = encoded.reshape(n_rounds * per_round, len_seq)
+    round_id = np.repeat(np.arange(n_rounds), per_round)
+    order = np.lexsort((*rows.T[::-1], round_id))
+    rows, round_id = rows[order], round_id[order]
+    new = np.ones(len(rows), dtype=bool)
+    new[1:] = (rows[1:] != rows[:-1]).any(axis=1) | (round_id[1:] != round_id[:-1])
+    return np.bincount(round_id[new], minlength=n_rounds)
+
+def score_block(parent, encoded, keep_lcs=False):
+    """Levenshtein, LCS (or None), LCS length and n_unique for an encoded block."""
+    per_round = encoded.shape[1]
+    i, j = np.triu_indices(per_round, k=1)
+    first = encoded[:, i].reshape(-1, encoded.shape[-1])
+    second = encoded[:, j].reshape(-1, encoded.shape[-1])
+    levenshtein = levenshtein_batch(first, second)
+    lcs = None
+    if keep_lcs:
+        lcs_length, starts = lcs_batch(first, second, return_start=True)
+        left = decode_sequences(parent, first)
+        lcs = np.array([s[k:k + n] for s, k, n in zip(left, starts, lcs_length)])
+    else:
+        lcs_length = lcs_batch(first, second)
+    return levenshtein, lcs, lcs_length, count_unique(encoded)
+
+def metric_accumulators(parent):
+    """Empty Levenshtein, LCS length, similarity and n_unique accumulators."""
+    len_seq = parent.len_seq
+    return (
+        Accumulator(len_seq + 1),
+        Accumulator(len_seq + 1),
+        Accumulator(len_seq + 1, offset=1.0, scale=-1.0 / len_seq),
+        # every sequence of a round can be distinct
+        Accumulator(parent.n_seq * len(parent.symbol_sets) + 1),
+    )
+
+def accumulate(accumulators, levenshtein, lcs_length, unique):
+    lev_acc, lcs_acc, similarity_acc, unique_acc = accumulators
+    lev_acc.update(levenshtein)
+    similarity_acc.update(levenshtein)
+    lcs_acc.update(lcs_length)
+    unique_acc.update(unique)
+    return accumulators
+
+def _simulate_chunk(parent, n_rounds, seed, keep_lcs, stream):
+    """One seeded chunk of rounds, as raw metrics or as accumulators."""
+    encoded = permutation_block(np.random.default_rng(seed), parent, n_rounds)
+    levenshtein, lcs, lcs_length, unique = score_block(parent, encoded, keep_lcs and not stream)
+    if stream:
+        return accumulate(metric_accumulators(parent), levenshtein, lcs_length, unique)
+    return levenshtein, lcs, lcs_length, unique
+
 class StringGenerator:
 
-    def __init__(self, symbol_sets, len_seq, n_seq=6, n_rounds=1000):
+    def __init__(self, symbol_sets, len_seq, n_seq=6, n_rounds=1000, workers=None, seed=SEED):
         self.symbol_sets = symbol_sets
         self.len_seq = len_seq
         self.symbols = set.union(*symbol_sets)
         self.n_seq = n_seq
         self.n_rounds = n_rounds
+        # rounds are drawn in chunks seeded from SeedSequence(seed), so the
+        # results are the same for any worker count; workers=None runs them
+        # in-process and seed=None draws fresh entropy
+        self.workers = workers
+        self.seed = seed
 
     class Round:
         
-        def __init__(self, parent):
+        def __init__(self, parent, keep_lcs=False):
             self.symbol_sets = parent.symbol_sets
             self.len_seq = parent.len_seq
             self.n_seq = parent.n_seq
             self.sequences = self.round()
             self.sequence_list = list(itertools.chain.from_iterable(self.sequences))
             self.pairs = list(itertools.combinations(self.sequence_list, 2))
-            self.levenshtein = np.array([Levenshtein.distance(s1, s2) for s1, s2 in self.pairs])
-            self.lcs = np.array([self.longest_common_substring(s1, s2) for s1, s2 in self.pairs])
-            self.lcs_len = np.array([len(lcs) for lcs in self.lcs])
+            i, j = np.triu_indices(len(self.sequence_list), k=1)
+            encoded = encode_sequences(self.sequence_list, parent.symbols)
+            self.levenshtein = levenshtein_batch(encoded[i], encoded[j])
+            self.lcs_len, starts = lcs_batch(encoded[i], encoded[j], return_start=True)
+            # the substrings themselves are only kept with keep_lcs=True
+            self.lcs = None
+            if keep_lcs:
+                self.lcs = np.array([s1[k:k + n] for (s1, _), k, n in zip(self.pairs, starts, self.lcs_len)])
             self.n_unique = len(set(itertools.chain.from_iterable(self.sequences)))
 
         @staticmethod
         def longest_common_substring(s1, s2):
-            matcher = difflib.SequenceMatcher(None, s1, s2)
-            match = matcher.find_longest_match(0, len(s1), 0, len(s2))
-            return s1[match.a: match.a + match.size]
+            if not s1 or not s2:
+                return ''
+            alphabet = set(s1) | set(s2)
+            length, start = lcs_batch(encode_sequences([s1], alphabet), encode_sequences([s2], alphabet),
+                                      return_start=True)
+            return s1[start[0]: start[0] + length[0]]
 
         def sequencer(self):
             permutations = ["".join(random.sample(list(symbol_set), self.len_seq)) for symbol_set in self.symbol_sets]
@@ -53,13 +268,22 @@ class StringGenerator:
 
     class Simulator:
 
-        def __init__(self, parent, n_seq=6, n_rounds=1000):
+        def __init__(self, parent, n_seq=6, n_rounds=1000, keep_lcs=False, stream=False, chunk=10000):
             self.parent = parent
             self.n_seq = n_seq
             self.n_rounds = n_rounds
+            self.keep_lcs = keep_lcs
+            self.stream = stream
+            self.chunk = chunk
 
-            self.levenshtein, self.lcs, self.lcs_len, self.n_unique = self.run_simulation()
-            self.similarity = 1 - (self.levenshtein / self.parent.len_seq)
+            results = self.run_chunks()
+            if stream:
+                # every metric is an Accumulator, so memory does not grow with n_rounds
+                self.levenshtein, self.lcs_len, self.similarity, self.n_unique = results
+                self.lcs = None
+            else:
+                self.levenshtein, self.lcs, self.lcs_len, self.n_unique = results
+                self.similarity = 1 - (self.levenshtein / self.parent.len_seq)
             self.p_unique = self.n_unique 
             # / (self.n_seq * self.parent.len_seq)
         
@@ -68,59 +292,116 @@ class StringGenerator:
                 self.levenshtein, self.lcs_len, self.similarity, self.p_unique, self.parent.len_seq
                 )
             
-        def run_simulation(self):
-            all_levenshtein = []
-            all_lcs = []
-            all_lcs_length = []
-            all_unique=[]
-            
-            for _ in range(self.n_rounds):
-                round_instance = self.parent.Round(self.parent)
-                all_levenshtein.extend(round_instance.levenshtein)
-                all_lcs.extend(round_instance.lcs)
-                all_lcs_length.extend(round_instance.lcs_len)
-                all_unique.append(round_instance.n_unique)
-            
-            return (np.array(all_levenshtein), 
-                    np.array(all_lcs), 
-                    np.array(all_lcs_length),
-                    np.array(all_unique))     
-            
+        def run_chunks(self):
+            """
+            Split the rounds into `chunk`-sized pieces, each drawing from its
+            own child of SeedSequence(parent.seed), and run them across
+            parent.workers processes (in-process for None or 1). Chunks are
+            merged in order, so results do not depend on the worker count.
+            With stream=True each chunk is folded into fixed-size
+            accumulators; otherwise self.lcs is None unless keep_lcs=True.
+            """
+            # n_rounds=0 still runs one empty chunk, for correctly typed empty results
+            sizes = [min(self.chunk, self.n_rounds - start) for start in range(0, self.n_rounds, self.chunk)] or [0]
+            seeds = np.random.SeedSequence(self.parent.seed).spawn(len(sizes))
+            args = ([self.parent] * len(sizes), sizes, seeds,
+                    [self.keep_lcs] * len(sizes), [self.stream] * len(sizes))
+            if (self.parent.workers or 1) <= 1:
+                chunks = list(map(_simulate_chunk, *args))
+            else:
+                with ProcessPoolExecutor(max_workers=self.parent.workers) as pool:
+                    chunks = list(pool.map(_simulate_chunk, *args))
+            if self.stream:
+                merged = metric_accumulators(self.parent)
+                for accumulators in chunks:
+                    for total, part in zip(merged, accumulators):
+                        total.merge(part)
+                return merged
+            levenshtein, lcs, lcs_length, unique = zip(*chunks)
+            return (np.concatenate(levenshtein),
+                    np.concatenate(lcs) if self.keep_lcs else None,
+                    np.concatenate(lcs_length),
+                    np.concatenate(unique))
+
+
+def histogram(metric, bins=None):
+    """
+    (values, counts, width) for one metric: an Accumulator's own bins,
+    exact bincounts for an integer array, or np.histogram (`bins`, default
+    auto) for anything else. Plotting only ever sees these few bars.
+    """
+    if isinstance(metric, Accumulator):
+        keep = metric.counts > 0
+        return metric.values[keep], metric.counts[keep], abs(metric.scale)
+    metric = np.asarray(metric)
+    if np.issubdtype(metric.dtype, np.integer):
+        counts = np.bincount(metric - metric.min()) if metric.size else np.zeros(0, dtype=np.int64)
+        values = metric.min() + np.arange(len(counts)) if metric.size else counts
+        keep = counts > 0
+        return values[keep], counts[keep], 1.0
+    counts, edges = np.histogram(metric, bins=bins if bins is not None else 'auto')
+    return (edges[:-1] + edges[1:]) / 2, counts, float(edges[1] - edges[0])
+
+def _plot_bokeh(histograms, titles, len_seq, show):
+    from bokeh.io import show as bokeh_show
+    from bokeh.layouts import gridplot
+    from bokeh.models import ColumnDataSource, LabelSet
+    from bokeh.plotting import figure
+
+    figures = []
+    for i, ((values, counts, width), title) in enumerate(zip(histograms, titles)):
+        fig = figure(title=title, width=520, height=400, y_range=(0, max(counts.max(initial=0) * 1.1, 1)))
+        source = ColumnDataSource(dict(x=values, top=counts, label=[str(c) for c in counts]))
+        fig.vbar(x='x', top='top', width=width * 0.9, source=source)
+        fig.add_layout(LabelSet(x='x', y='top', text='label', source=source,
+                                text_align='center', y_offset=3, text_font_size='9pt'))
+        fig.xaxis.axis_label = "Value"
+        if i < 2:  # integer x-ticks from 0 to len_seq, as in the matplotlib plots
+            fig.xaxis.ticker = list(range(len_seq + 1))
+        figures.append(fig)
+    layout = gridplot(figures, ncols=2)
+    if show:
+        bokeh_show(layout)
+    return layout
+
+def plot_simulation(metrics, backend='matplotlib', show=True):
+    """
+    Plot the four metric distributions from Simulator.metrics(). Raw arrays
+    are binned once up front and Accumulators are drawn from their own
+    bins, so drawing costs the same however many rounds were run. y-limits
+    follow the tallest bar. backend='bokeh' returns a bokeh grid instead.
+    """
+    metric1, metric2, metric3, metric4, len_seq = metrics
+    titles = ["Levenshtein Distance", "Longest Common Substring", "Similarity", "Proportion of Unique Sequences / round"]
+    histograms = [histogram(m, bins=len_seq if i == 2 else None)
+                  for i, m in enumerate([metric1, metric2, metric3, metric4])]
+
+    if backend == 'bokeh':
+        return _plot_bokeh(histograms, titles, len_seq, show)
+    if backend != 'matplotlib':
+        raise ValueError(f"unknown backend {backend!r}")
 
-def plot_simulation(metrics):
-    
     sns.set_theme(style="whitegrid")
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
     fig.suptitle("Metric Distributions", fontsize=16)
-    
-    metric1, metric2, metric3, metric4, len_seq = metrics
-    titles = ["Levenshtein Distance", "Longest Common Substring", "Similarity", "Proportion of Unique Sequences / round"]
 
-    for i, (metric, title) in enumerate(zip([metric1, metric2, metric3, metric4], titles)):
+    for i, ((values, counts, width), title) in enumerate(zip(histograms, titles)):
         ax = axes[i // 2, i % 2]
-
-        if i < 2:  # Top two plots (discrete bins, integer x-ticks from 0 to len_seq)
-            sns.histplot(metric, discrete=True, bins=int(max(metric) - min(metric) + 1), ax=ax)
-            ax.set_xticks(range(0, len_seq + 1))  # X-ticks from 0 to len_seq
-        elif i == 2:  # Bottom two plots (len_seq bins)
-            sns.histplot(metric, bins=len_seq, ax=ax)
-        else:
-            sns.histplot(metric, ax=ax)
+        bars = ax.bar(values, counts, width=width * 0.9)
+        if i < 2:  # Top two plots (integer x-ticks from 0 to len_seq)
+            ax.set_xticks(range(0, len_seq + 1))
 
         ax.set_title(title, fontsize=14)
         ax.set_xlabel("Value", fontsize=12)
-        if i < 3:
-            ax.set_ylim(0, 120000)  # Set y-limits
-        else:
-            ax.set_ylim(0, 1200)
+        ax.set_ylim(0, max(counts.max(initial=0) * 1.1, 1))
 
         # Display count on top of each bar
-        for patch in ax.patches:
-            height = patch.get_height()
-            if height > 0:
-                ax.annotate(f'{int(height)}', 
-                            (patch.get_x() + patch.get_width() / 2., height),
-                            ha='center', va='center', fontsize=10, color='black', xytext=(0, 5), textcoords='offset points')
+        for bar, height in zip(bars, counts):
+            ax.annotate(f'{int(height)}',
+                        (bar.get_x() + bar.get_width() / 2., height),
+                        ha='center', va='center', fontsize=10, color='black', xytext=(0, 5), textcoords='offset points')
 
     plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+    return fig
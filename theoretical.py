@@ -1,132 +1,208 @@
-class wm():
-    def __init__(self):    
-        wm.value = 0
-        wm.cache = []
-    def update(self, value):
-        wm.value += value
-        wm.cache.append(wm.value)
-    @property
-    def max_space(self):
-        return max(wm.cache)
+import numpy as np
 
-def calculate_theoretical_complexity(algorithm, n, divs = None):
-    kolmo = 0
-    space = wm()
-    if algorithm == 'chaning':
-        pass
-    if algorithm == 'ordinal':
-        pass
-    if algorithm == 'iterate':
-        group = n / divs
-        space.update(divs * (1 + 2*group)) #lexicon
-        while(n):
-            space.update(2) # current
-            kolmo += 1 # current pf.sample
-            kolmo += 1 # remove
-            space.update(-2) # update lexicon
-            n -= 1 # update lexicon
-            # write_all
-            # making find lexicon uses move so total space is not affected
-            kolmo += (1 + (group - 1)*2) # find pf
-            for _ in range(group - 2):
-                kolmo += 3 # pfs: sample, add, remove
-                space.update(-2)
-                n -= 1
-            kolmo += 2 # pfs: sample, add, remove for the last item
-            space.update(-2) # remove last element from sub_lex
-            space.update(-1) # remove attrbute node from sub_lex
-            n -= 1
-            space.update(-2) # purge current
-        
-    if algorithm == 'palindrome':
-        space.update(divs * (1 + 2*group)) # lexicon
-        for _ in range(n/2):
-            kolmo += 1 # loop
-            # sample current
-            space.update(2)
-            kolmo += 1 
-            # add to basis
-            kolmo += 1
-            space.update(2)
-            # remove from lexicon
-            kolmo += 1
-            space.update(-2)
-            # pushing out to a diff lex
-            kolmo += 2 # finding sublex
-            kolmo += 0 # sample after finding
-            kolmo += 2 # add, remove
-            space.update(-2) # purge current
-        basis = n/2
-        for _ in range(n/2):
-            kolmo += 1 # loop
-            # push out from basis
-            kolmo += 1 #space stays the same since it's being moved to remainder
-            # iterate through basis, a queue
-            remainder = 0
-            while(basis):
-                kolmo += 1 # loop
-                # add to remainder
-                kolmo += 1
-                remainder += 1
-                # push_out next
-                kolmo += 1
-                basis -= 1
-            # write the other one
-            kolmo += 1 # find and sample
-            kolmo += 2 # add and remove
-            basis = remainder
-            space.update(-4) # removed from lexixon and basis
-    
-    if algorithm == 'alternate':
-        space.update(divs * (1 + 2*group)) # lexicon
-        # current
-        kolmo += 1 # sample
-        space.update(2)
-        # remove from lexicon
-        kolmo += 1
-        space.update(-2)
-        alternates = n/2
-        for _ in range (n - 2):
-            kolmo += 1 # loop
-            # find_alternates
-            kolmo += alternates
-            # sample
-            kolmo += 1
-            # remove 
-            kolmo += 1
-            if _ % 2 == 0:
-                alternates -= 1
-            space.update(-2)
-            if _ == n-3:
-                space.update(-1) # remove the attribute node
-        #getting rid of the last one
-        kolmo += 1 #find the other one
-        kolmo += 1 # remove
-        space.update(-3) # remove token and the attr node from lexicon
-    
-    if algorithm == 'seriate':
-        group = n/divs
-        kolmo += (divs*3) 
-        kolmo += divs*((group - 1)*(1 + 3) - 1) # for the write_all
-        kolmo += (group - 1)*(1+1+1) # buffer except write random
-        kolmo += ((group-1)*(group-2))/2 + (group-2) + 2*(group-1)
-
-
-
-    if algorithm == 'serial-crossed':
-        pass
-    if algorithm == 'center-embedded':
-        pass
-    if algorithm == 'tail-recursive':
-        pass
-    
-    return (kolmo, space.max_space)
+# Closed-form kolmo and peak space for the cognitive functions, evaluated on
+# whole arrays of (n, divs) at once. Lexicons are laid out as LexiconSpec
+# does it: n tokens, attribute1 in `divs` groups of g = n / divs, and for the
+# 2D functions an attribute2 shared by the `divs` tokens of each row. A
+# token weighs 2 in a 1D lexicon (node + attribute edge) and 3 in a 2D one.
+# Space follows the model's bookkeeping: a structure is charged while it is
+# alive, so a sub-lexicon from pf.find counts until the caller drops it.
+#
+# Each model also returns its supported domain: the layouts on which the
+# real function always completes and its cost does not depend on the seed.
+# Outside it the prediction is NaN (see `supported`):
+#   palindrome        groups of at most 2 (basis runs dry on larger ones)
+#   alternate         divs == 2, or a single token; with more groups both the
+#                     cost and whether the run completes depend on the path
+#   serial_crossed,
+#   center_embedded   divs <= 2
+#   tail_recursive    divs == 1, or divs == 2 with groups of 2; other
+#                     layouts crash unless every inner write finds one match
+
+FUNCTIONS = (
+    'iterate', 'palindrome', 'alternate', 'seriate',
+    'serial_crossed', 'center_embedded', 'tail_recursive',
+)
+DIMS = {
+    'iterate': 1, 'palindrome': 1, 'alternate': 1, 'seriate': 1,
+    'serial_crossed': 2, 'center_embedded': 2, 'tail_recursive': 2,
+}
+
+def _gt(x, k):
+    return (x > k).astype(float)
+
+def _drain(k):
+    """
+    Kolmo of write_random(found=True) emptying a lexicon of k tokens, one
+    token at a time (sizes k..1): sample is free on the last token and
+    write_random itself on the second to last.
+    """
+    return 2 * k + (k - _gt(k, 1)) + np.maximum(k - 1, 0)
+
+def _iterate(n, d, g):
+    # per group: loop, sample, remove, inquire; find adds g-1 and moves them
+    kolmo = d * (4 + 2 * (g - 1) + _drain(g - 1)) - (g == 1)
+    # the found group sits next to the lexicon before it is moved out
+    space = 2 * n + np.maximum(2 * g - 4, 0)
+    return kolmo, space, np.ones_like(kolmo, dtype=bool)
+
+def _write_all_to_buffer(n, d, g):
+    """First loop of palindrome and seriate: iterate plus a push into basis."""
+    kolmo = d * (5 + 2 * (g - 1) + _drain(g - 1)) - (g == 1)
+    space = np.maximum(2 * n + 1, 2 * n + 2 * g - 3)
+    return kolmo, space
+
+def _palindrome(n, d, g):
+    kolmo, space = _write_all_to_buffer(n, d, g)
+    # round b pushes the whole basis through a remainder queue, then writes
+    # the buffer's single match: 1 + 2 + 4 (b - 1) + 4
+    kolmo = kolmo + (g == 2) * (2 * d * (d + 1) + 3 * d)
+    # basis only holds one token per group; larger groups run it dry
+    return kolmo, space, g <= 2
 
+def _alternate(n, d, g):
+    # with two groups the walk is forced to alternate, so step t finds
+    # m_t = floor((n - t) / 2) tokens of the other group
+    t = np.arange(max(int(np.max(n)) - 1, 0))
+    steps = t < (n - 1)[..., None]
+    m = ((n[..., None] - t) // 2) * steps
+    kolmo = _gt(n, 1) + 1 + 4 * (n - 1) + m.sum(axis=-1) + (m > 1).sum(axis=-1)
+    # the previous step's alternates are still alive while the next find
+    # builds its own: peak at the first or second find
+    space = np.maximum(2 * n, np.maximum(3 * n - 2, 4 * n - 6))
+    return kolmo, space, (d == 2) | (n == 1)
 
+def _seriate(n, d, g):
+    kolmo, space = _write_all_to_buffer(n, d, g)
+    # second loop: d(g - 1) writes; with m tokens left per group each costs
+    # loop, push_out, inquire, m adds, sample, add, remove, write_random, add
+    kolmo = kolmo + d * (7 * (g - 1) + g * (g - 1) / 2 + 2 * np.maximum(g - 2, 0))
+    # each write's find is dropped before the next, so the first loop's
+    # peak stands
+    return kolmo, space, np.ones_like(kolmo, dtype=bool)
 
+def _chunk_first(n, d, g, move):
+    """Opening of the 2D functions: sample, queue and find the first chunk."""
+    kolmo = _gt(n, 1) + 2 + 1 + (g - 1)
+    if move:
+        kolmo = kolmo + (g - 1)
+    return kolmo
 
+def _serial_crossed(n, d, g):
+    kolmo = _chunk_first(n, d, g, move=False)
+    # drain the chunk into basis, removing from both buffer and lexicon
+    kolmo = kolmo + 4 * (g - 1) + np.maximum(g - 2, 0)
+    # one write per remaining token, each finding exactly one match
+    kolmo = kolmo + 7 * (n - g)
+    space = 3 * n + np.maximum(3, 3 * g - 2)
+    return kolmo, space, d <= 2
+
+def _center_embedded(n, d, g):
+    kolmo = _chunk_first(n, d, g, move=True)
+    kolmo = kolmo + 3 * (g - 1) + np.maximum(g - 2, 0)
+    # as palindrome's second loop, over a basis of g tokens
+    kolmo = kolmo + (d == 2) * (2 * g * (g + 1) + 3 * g)
+    space = 3 * n + np.maximum(3, 3 * g - 3)
+    return kolmo, space, d <= 2
+
+def _tail_recursive(n, d, g):
+    # the first chunk still holds `current`, so all g tokens are drained
+    kolmo = _gt(n, 1) + 2 + g + 4 * g + (g - 1)
+    # one pass of the outer loop empties the other chunk; each inner write
+    # is assumed to find a single match, which is the only path that does
+    # not crash on an empty sample
+    kolmo = kolmo + (d == 2) * (9 + _gt(g - 1, 1) + 10 * (g - 2))
+    space = 3 * n + 3 * g + 4
+    return kolmo, space, (d == 1) | ((d == 2) & (g == 2))
+
+MODELS = {
+    'iterate': _iterate,
+    'palindrome': _palindrome,
+    'alternate': _alternate,
+    'seriate': _seriate,
+    'serial_crossed': _serial_crossed,
+    'center_embedded': _center_embedded,
+    'tail_recursive': _tail_recursive,
+}
+
+def predict(algorithm, n, divs):
+    """
+    Predicted (kolmo, space) for arrays of n and divs, broadcast together.
+    Points outside the algorithm's supported domain, including n not a
+    multiple of divs, come back as NaN.
+    """
+    model = MODELS[algorithm.replace('-', '_')]
+    n, d = np.broadcast_arrays(np.asarray(n, dtype=np.int64), np.asarray(divs, dtype=np.int64))
+    ok = (n > 0) & (d > 0) & (n % np.maximum(d, 1) == 0)
+    d_safe = np.where(ok, d, 1)
+    n_safe = np.where(ok, n, 1)
+    g = n_safe // d_safe
+    kolmo, space, valid = model(n_safe, d_safe, g)
+    ok = ok & valid
+    kolmo = np.where(ok, kolmo, np.nan).astype(float)
+    space = np.where(ok, space, np.nan).astype(float)
+    return kolmo, space
+
+def supported(algorithm, n, divs):
+    """Boolean mask of the (n, divs) points `predict` has a value for."""
+    return ~np.isnan(predict(algorithm, n, divs)[0])
+
+def calculate_theoretical_complexity(algorithm, n, divs = None):
+    divs = divs if divs is not None else 1
+    if not supported(algorithm, n, divs):
+        raise ValueError(f"{algorithm} has no model for n={n}, divs={divs}")
+    kolmo, space = predict(algorithm, n, divs)
+    return float(kolmo), float(space)
 
+def cross_check(algorithms = FUNCTIONS, n = range(2, 25), divs = range(1, 7), *,
+                points = 20, seeds = range(3), rng = 0, workers = 0):
+    """
+    Sample `points` supported (n, divs) cells per algorithm, run the real
+    function there for each seed, and report predicted vs observed totals.
+    Divergence is measured against the largest observed value, so NaN means
+    no run finished.
+    """
+    import pandas as pd
+    from model.lexicons import LexiconSpec
+    from model.sweep import Job, sweep
 
+    gen = np.random.default_rng(rng)
+    grid_n, grid_d = np.meshgrid(np.asarray(n), np.asarray(divs), indexing='ij')
+    grid_n, grid_d = grid_n.ravel(), grid_d.ravel()
 
+    cells, jobs = [], []
+    for algorithm in algorithms:
+        domain = supported(algorithm, grid_n, grid_d)
+        cell_n, cell_d = grid_n[domain], grid_d[domain]
+        pick = gen.choice(len(cell_n), size=min(points, len(cell_n)), replace=False)
+        kolmo, space = predict(algorithm, cell_n[pick], cell_d[pick])
+        for i, p in enumerate(pick):
+            spec = LexiconSpec(int(cell_n[p]), int(cell_d[p]), DIMS[algorithm])
+            cells.append((algorithm, spec.n, spec.divs, kolmo[i], space[i]))
+            for seed in seeds:
+                jobs.append(Job(len(jobs), f'model.cognitive_functions:{algorithm}', spec, seed))
 
+    results = pd.DataFrame([
+        dict(algorithm=r.job.function.split(':')[1], n=r.job.spec.n, divs=r.job.spec.divs,
+             mdl=r.mdl, space=r.space_complexity, failed=r.error is not None)
+        for r in sweep(jobs, workers=workers)
+    ])
+    observed = results.groupby(['algorithm', 'n', 'divs']).agg(
+        kolmo_min=('mdl', 'min'), kolmo_max=('mdl', 'max'),
+        space_max=('space', 'max'), failures=('failed', 'sum'), runs=('failed', 'size'),
+    ).reset_index()
+    predicted = pd.DataFrame(cells, columns=['algorithm', 'n', 'divs', 'kolmo_pred', 'space_pred'])
+    report = predicted.merge(observed, on=['algorithm', 'n', 'divs'], how='left')
+    report['kolmo_err'] = (report.kolmo_pred - report.kolmo_max).abs()
+    report['kolmo_spread'] = report.kolmo_max - report.kolmo_min
+    report['space_err'] = (report.space_pred - report.space_max).abs()
+    return report
 
+def unvalidated(report, tol = 0.0):
+    """
+    Cells of a cross_check report whose formulas still need simulating: a
+    cell is settled when every run finished and both totals agree within
+    `tol`.
+    """
+    agree = (report.kolmo_err <= tol) & (report.space_err <= tol)
+    return report[~agree | (report.failures > 0)]